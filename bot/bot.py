@@ -14,9 +14,16 @@ from telebot.types import (
     ReplyKeyboardMarkup,
     ChatJoinRequest,
 )
-from bot.services.user_service import register_user, toggle_anonymity, get_user_stats
+from bot.services.user_service import register_user, toggle_anonymity, get_user_stats, get_user_pk
 from bot.services.confession_service import create_confession
-from bot.services.notification_service import notify_admins_new_confession, notify_user_confession_status
+from bot.services.notification_service import (
+    admin_review_keyboard,
+    clear_user_blocked,
+    confession_author,
+    confession_preview,
+    notify_admins_new_confession,
+    notify_user_confession_status,
+)
 from bot.models import User, Confession, Comment
 from bot.handlers import handle_view_comments, handle_comments_pagination, show_comments_for_confession, update_comment_message
 from bot.services.analytics_service import AnalyticsService
@@ -37,10 +44,17 @@ def track_interaction(telegram_id, interaction_type):
         interaction_type: Type of interaction (message, command, button_click, etc.)
     """
     try:
-        # Get user - if user doesn't exist, skip tracking silently
-        user = User.objects.filter(telegram_id=telegram_id).first()
-        if user:
-            AnalyticsService.track_user_interaction(user, interaction_type)
+        # Collapse bursts of low-value taps before touching the database
+        if not AnalyticsService.claim_interaction(telegram_id, interaction_type):
+            return
+        
+        # Get user id (usually from cache) - if user doesn't exist, skip tracking silently
+        user_pk = get_user_pk(telegram_id)
+        if user_pk is not None:
+            if AnalyticsService.buffer_interactions:
+                AnalyticsService.record_interaction(user_pk, interaction_type, telegram_id=telegram_id)
+            else:
+                AnalyticsService.track_user_interaction(user_pk, interaction_type, telegram_id=telegram_id)
     except Exception as e:
         # Log error but don't let tracking failures affect bot functionality
         logger.warning(f"Failed to track interaction for user {telegram_id}: {e}")
@@ -147,10 +161,10 @@ def get_confession_or_error(confession_id):
         tuple: (confession or None, error_message or None)
     """
     try:
-        confession = Confession.objects.get(id=confession_id)
+        confession = Confession.objects.filter(id=confession_id).first()
+        if confession is None:
+            return None, f"❌ Confession with ID #{confession_id} not found. The confession ID is invalid."
         return confession, None
-    except Confession.DoesNotExist:
-        return None, f"❌ Confession with ID #{confession_id} not found. The confession ID is invalid."
     except DatabaseError as e:
         logger.error(f"Database error fetching confession {confession_id}: {e}")
         return None, "❌ A temporary database issue occurred. Please try again in a moment."
@@ -167,10 +181,10 @@ def get_user_or_error(telegram_id):
         tuple: (user or None, error_message or None)
     """
     try:
-        user = User.objects.get(telegram_id=telegram_id)
+        user = User.objects.filter(telegram_id=telegram_id).first()
+        if user is None:
+            return None, "❌ You need to /register first before using this command."
         return user, None
-    except User.DoesNotExist:
-        return None, "❌ You need to /register first before using this command."
     except DatabaseError as e:
         logger.error(f"Database error fetching user {telegram_id}: {e}")
         return None, "❌ A temporary database issue occurred. Please try again in a moment."
@@ -217,10 +231,10 @@ def get_comment_or_error(comment_id):
         tuple: (comment or None, error_message or None)
     """
     try:
-        comment = Comment.objects.get(id=comment_id)
+        comment = Comment.objects.filter(id=comment_id).first()
+        if comment is None:
+            return None, f"❌ Comment with ID #{comment_id} not found."
         return comment, None
-    except Comment.DoesNotExist:
-        return None, f"❌ Comment with ID #{comment_id} not found."
     except DatabaseError as e:
         logger.error(f"Database error fetching comment {comment_id}: {e}")
         return None, "❌ A temporary database issue occurred. Please try again in a moment."
@@ -242,15 +256,17 @@ def rebuild_comment_view(comment, chat_id, message_id):
     comment.refresh_from_db()
     confession = comment.confession
     
-    # Find which page this comment is on
+    # Find which page this comment is on, in get_comments' keyset order
     all_comments = Comment.objects.filter(
         confession=confession,
         parent_comment=None
-    ).order_by('-created_at')
+    ).order_by('-created_at', '-id')
     
-    comment_index = list(all_comments.values_list('id', flat=True)).index(comment.id)
+    # The id list already gives the total, so no separate COUNT(*) query
+    comment_ids = list(all_comments.values_list('id', flat=True))
+    comment_index = comment_ids.index(comment.id)
     current_page = comment_index + 1
-    total_comments = all_comments.count()
+    total_comments = len(comment_ids)
     
     # Build response text
     confession_preview = confession.text[:150] + "..." if len(confession.text) > 150 else confession.text
@@ -308,6 +324,9 @@ def start_command(message: Message):
     telegram_id = message.from_user.id
     user_name = message.from_user.first_name
     
+    # Talking to the bot again means it was unblocked
+    clear_user_blocked(telegram_id)
+    
     # Auto-register user if not already registered
     try:
         user, error = get_user_or_error(telegram_id)
@@ -782,16 +801,12 @@ def is_admin(telegram_id):
     Returns:
         bool: True if user is admin, False otherwise
     """
-    # Check if user is in ADMINS list from settings
+    # Check if user is in ADMINS set from settings
     if telegram_id in settings.ADMINS:
         return True
     
     # Check if user has is_admin flag in database
-    try:
-        user = User.objects.get(telegram_id=telegram_id)
-        return user.is_admin
-    except User.DoesNotExist:
-        return False
+    return User.objects.filter(telegram_id=telegram_id, is_admin=True).exists()
 
 
 @bot.message_handler(commands=['pending'])
@@ -856,12 +871,7 @@ def pending_command(message: Message):
                 confession_text = header + confession_full_text
             
             # Create inline keyboard with approve/reject buttons
-            from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-            keyboard = InlineKeyboardMarkup()
-            keyboard.row(
-                InlineKeyboardButton("✅ Approve", callback_data=f"approve_{confession.id}"),
-                InlineKeyboardButton("❌ Reject", callback_data=f"reject_{confession.id}")
-            )
+            keyboard = admin_review_keyboard(confession.id)
             
             # Send the confession with buttons (or just buttons if we already sent the text)
             if len(header) + len(confession_full_text) <= max_text_length:
@@ -1257,7 +1267,7 @@ def view_feedback_command(message: Message):
     try:
         from bot.models import Feedback
         # Get recent feedback (last 10)
-        feedbacks = Feedback.objects.all().order_by('-created_at')[:10]
+        feedbacks = Feedback.objects.with_users().order_by('-created_at')[:10]
         
         if not feedbacks:
             bot.reply_to(message, "📭 No feedback received yet.")
@@ -1449,7 +1459,7 @@ def view_single_feedback_command(message: Message):
         feedback_id = int(parts[1])
         
         from bot.models import Feedback
-        feedback = Feedback.objects.get(id=feedback_id)
+        feedback = Feedback.objects.with_users().get(id=feedback_id)
         
         # Use the same function to send feedback with buttons
         send_feedback_with_buttons(bot, message.chat.id, feedback)
@@ -1936,7 +1946,7 @@ def comments_command(message: Message):
         
         response_text = f"<b>💬 Comments on Confession {confession_id}</b>\n\n"
         response_text += f"<i>{confession_preview}</i>\n\n"
-        response_text += f"<b>Comments (Page {comments_data['current_page']} of {comments_data['total_pages']}):</b>\n\n"
+        response_text += f"<b>Comments (Page {comments_data['current_page']}):</b>\n\n"
         
         for comment in comments_data['comments']:
             # Comments are anonymous - don't show commenter identity
@@ -2304,13 +2314,8 @@ def handle_approve_confession(call: CallbackQuery):
         # Check if confession is still pending
         if confession.status != 'pending':
             # Update the message to show current status
-            author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-            if not confession.is_anonymous and confession.user.username:
-                author += f" (@{confession.user.username})"
-            
-            preview_text = confession.text
-            if len(preview_text) > 200:
-                preview_text = preview_text[:200] + "..."
+            author = confession_author(confession)
+            preview_text = confession_preview(confession.text)
             
             status_emoji = {'approved': '✅', 'rejected': '❌'}.get(confession.status, '❓')
             reviewed_by = confession.reviewed_by.first_name if confession.reviewed_by else "Unknown Admin"
@@ -2352,13 +2357,8 @@ def handle_approve_confession(call: CallbackQuery):
         notify_user_confession_status(confession, 'approved', bot)
         
         # Update the admin notification message
-        author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-        if not confession.is_anonymous and confession.user.username:
-            author += f" (@{confession.user.username})"
-        
-        preview_text = confession.text
-        if len(preview_text) > 200:
-            preview_text = preview_text[:200] + "..."
+        author = confession_author(confession)
+        preview_text = confession_preview(confession.text)
         
         updated_text = f"""
 ✅ <b>Confession Approved</b>
@@ -2432,13 +2432,8 @@ def handle_reject_confession(call: CallbackQuery):
         # Check if confession is still pending
         if confession.status != 'pending':
             # Update the message to show current status
-            author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-            if not confession.is_anonymous and confession.user.username:
-                author += f" (@{confession.user.username})"
-            
-            preview_text = confession.text
-            if len(preview_text) > 200:
-                preview_text = preview_text[:200] + "..."
+            author = confession_author(confession)
+            preview_text = confession_preview(confession.text)
             
             status_emoji = {'approved': '✅', 'rejected': '❌'}.get(confession.status, '❓')
             reviewed_by = confession.reviewed_by.first_name if confession.reviewed_by else "Unknown Admin"
@@ -2480,13 +2475,8 @@ def handle_reject_confession(call: CallbackQuery):
         notify_user_confession_status(confession, 'rejected', bot)
         
         # Update the admin notification message
-        author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-        if not confession.is_anonymous and confession.user.username:
-            author += f" (@{confession.user.username})"
-        
-        preview_text = confession.text
-        if len(preview_text) > 200:
-            preview_text = preview_text[:200] + "..."
+        author = confession_author(confession)
+        preview_text = confession_preview(confession.text)
         
         updated_text = f"""
 ❌ <b>Confession Rejected</b>
@@ -83,7 +83,7 @@ def build_comment_text(comment, is_reply=False):
     
     # User stats line
     user = comment.user
-    impact_points = calculate_impact_points(user)
+    impact_points = calculate_impact_points(user)['impact_points']
     acceptance_score = calculate_acceptance_score(user)
     
     # Convert acceptance score from 0-100 to 0-10 scale
@@ -105,7 +105,10 @@ def build_comment_text(comment, is_reply=False):
     
     # For parent comments, show reply count (but not the replies themselves)
     if not is_reply:
-        reply_count = comment.replies.count()
+        # get_comments annotates reply_count; count directly otherwise
+        reply_count = getattr(comment, 'reply_count', None)
+        if reply_count is None:
+            reply_count = comment.replies.count()
         if reply_count > 0:
             comment_text += f"\n\n💬 <i>{reply_count} {'reply' if reply_count == 1 else 'replies'} below</i>"
     
@@ -180,7 +183,16 @@ def update_comment_message(bot, chat_id, message_id, comment):
         logger.error(f"Error updating comment message: {e}")
 
 
-def send_page_header(bot, chat_id, confession_id, page, total_pages, has_prev, has_next):
+def page_callback_data(confession_id, page, cursor=None):
+    """Callback data for a comments page, carrying the keyset cursor if any"""
+    callback_data = f"comments_page_{confession_id}_{page}"
+    if cursor:
+        callback_data += f"_{cursor}"
+    return callback_data
+
+
+def send_page_header(bot, chat_id, confession_id, page, has_prev, has_next,
+                     previous_cursor=None, next_cursor=None):
     """
     Send page header:
     💬 Comments for Confession #42 • Page 1
@@ -205,14 +217,14 @@ def send_page_header(bot, chat_id, confession_id, page, total_pages, has_prev, h
         nav_buttons.append(
             InlineKeyboardButton(
                 "⬅️ Prev",
-                callback_data=f"comments_page_{confession_id}_{page - 1}"
+                callback_data=page_callback_data(confession_id, page - 1, previous_cursor)
             )
         )
     if has_next:
         nav_buttons.append(
             InlineKeyboardButton(
                 "Next ➡️",
-                callback_data=f"comments_page_{confession_id}_{page + 1}"
+                callback_data=page_callback_data(confession_id, page + 1, next_cursor)
             )
         )
     
@@ -249,7 +261,7 @@ def show_comments_for_confession(bot, chat_id, confession_id, page=1):
             return
         
         # Get comments for requested page
-        comments_data = get_comments(confession, page=page, page_size=PAGE_SIZE)
+        comments_data = get_comments(confession, page=page, page_size=PAGE_SIZE, with_replies=True)
         
         # Send page header (separate message)
         send_page_header(
@@ -257,9 +269,10 @@ def show_comments_for_confession(bot, chat_id, confession_id, page=1):
             chat_id,
             confession_id,
             page,
-            comments_data['total_pages'],
             comments_data['has_previous'],
-            comments_data['has_next']
+            comments_data['has_next'],
+            comments_data['previous_cursor'],
+            comments_data['next_cursor']
         )
         
         # Send each comment as separate message
@@ -271,7 +284,8 @@ def show_comments_for_confession(bot, chat_id, confession_id, page=1):
                 send_comment_message(bot, chat_id, comment)
                 
                 # Send replies as separate messages with their own buttons
-                replies = comment.replies.all().order_by('created_at')[:5]
+                # Replies are prefetched oldest first
+                replies = list(comment.replies.all())[:5]
                 for reply in replies:
                     send_comment_message(bot, chat_id, reply, is_reply=True)
         
@@ -305,10 +319,12 @@ def handle_comments_pagination(bot, call: CallbackQuery):
     Deletes old pagination message and sends new page.
     """
     try:
-        # Extract confession ID and page
+        # Extract confession ID, page and keyset cursor (older buttons
+        # only carry the page number)
         parts = call.data.split('_')
         confession_id = int(parts[2])
         page = int(parts[3])
+        cursor = parts[4] if len(parts) > 4 else None
         
         # Get confession
         try:
@@ -318,7 +334,7 @@ def handle_comments_pagination(bot, call: CallbackQuery):
             return
         
         # Get comments for requested page
-        comments_data = get_comments(confession, page=page, page_size=PAGE_SIZE)
+        comments_data = get_comments(confession, page=page, page_size=PAGE_SIZE, cursor=cursor)
         
         # Delete the pagination message
         try:
@@ -332,9 +348,10 @@ def handle_comments_pagination(bot, call: CallbackQuery):
             call.message.chat.id,
             confession_id,
             page,
-            comments_data['total_pages'],
             comments_data['has_previous'],
-            comments_data['has_next']
+            comments_data['has_next'],
+            comments_data['previous_cursor'],
+            comments_data['next_cursor']
         )
         
         # Send comments
@@ -3,13 +3,19 @@ Management command to clean up old interaction data.
 This implements data retention policies for privacy compliance.
 """
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Min
 from django.utils import timezone
 from datetime import timedelta
 from bot.models import UserInteraction
+from bot.services.analytics_service import AnalyticsService
+from bot.utils import estimate_row_count
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows removed per DELETE, keeps each statement's locks and memory bounded
+DELETE_BATCH_SIZE = 10000
+
 
 class Command(BaseCommand):
     help = 'Clean up old user interaction data based on retention policy'
@@ -36,26 +42,32 @@ class Command(BaseCommand):
         
         # Find interactions older than the retention period
         old_interactions = UserInteraction.objects.filter(timestamp__lt=cutoff_date)
-        count = old_interactions.count()
         
         if dry_run:
+            # Count and date range in a single round trip
+            stats = old_interactions.aggregate(
+                count=Count('*'),
+                oldest=Min('timestamp'),
+                newest=Max('timestamp'),
+            )
+            count = stats['count']
             self.stdout.write(
                 self.style.WARNING(
                     f'DRY RUN: Would delete {count} interactions older than {retention_days} days'
                 )
             )
             if count > 0:
-                oldest = old_interactions.order_by('timestamp').first()
-                newest = old_interactions.order_by('-timestamp').first()
                 self.stdout.write(
-                    f'  Oldest: {oldest.timestamp}'
+                    f'  Oldest: {stats["oldest"]}'
                 )
                 self.stdout.write(
-                    f'  Newest: {newest.timestamp}'
+                    f'  Newest: {stats["newest"]}'
                 )
         else:
-            # Delete old interactions
-            deleted_count, _ = old_interactions.delete()
+            # Delete old interactions in batches, entirely in the database
+            deleted_count = AnalyticsService.delete_interactions_before(
+                cutoff_date, batch_size=DELETE_BATCH_SIZE
+            )
             
             self.stdout.write(
                 self.style.SUCCESS(
@@ -65,8 +77,8 @@ class Command(BaseCommand):
             
             logger.info(f'Cleaned up {deleted_count} old interactions (retention: {retention_days} days)')
         
-        # Show current statistics
-        remaining_count = UserInteraction.objects.count()
+        # Show current statistics (planner estimate on PostgreSQL)
+        remaining_count = estimate_row_count(UserInteraction)
         self.stdout.write(
             f'Remaining interactions in database: {remaining_count}'
         )
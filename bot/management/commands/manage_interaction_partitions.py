@@ -0,0 +1,184 @@
+"""
+Management command to maintain the monthly partitions of bot_userinteraction.
+Creates upcoming partitions and drops ones that are past the retention period.
+Only applies once the table has been partitioned (see partition_user_interactions.sql).
+"""
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'bot_userinteraction'
+PARTITION_PREFIX = f'{TABLE_NAME}_'
+DEFAULT_PARTITION = f'{TABLE_NAME}_default'
+# Same as migration 0015; a partitioned parent can't carry it, so every
+# partition is created with it
+AUTOVACUUM_INSERT_SCALE_FACTOR = 0.02
+
+
+def _add_months(month_start, months):
+    """Return the first day of the month `months` after month_start."""
+    month_index = month_start.month - 1 + months
+    return date(month_start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_name(month_start):
+    return f'{PARTITION_PREFIX}{month_start:%Y_%m}'
+
+
+def _create_partition(cursor, name, month_start, month_end, has_default):
+    """
+    Create the monthly partition for [month_start, month_end).
+    
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows in its range, so those rows are moved over: the default is
+    detached, the partition created, the rows moved and the default
+    re-attached. Call inside a transaction so a failure leaves the table
+    as it was.
+    
+    Returns:
+        int: Number of rows moved out of the default partition
+    """
+    table = connection.ops.quote_name(TABLE_NAME)
+    partition = connection.ops.quote_name(name)
+    default = connection.ops.quote_name(DEFAULT_PARTITION)
+    bounds = [month_start, month_end]
+    
+    has_rows = False
+    if has_default:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s)',
+            bounds,
+        )
+        has_rows = cursor.fetchone()[0]
+    
+    if has_rows:
+        cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {default}')
+    
+    cursor.execute(
+        f'CREATE TABLE {partition} PARTITION OF {table} '
+        "FOR VALUES FROM (%s) TO (%s) "
+        f"WITH (autovacuum_vacuum_insert_scale_factor = {AUTOVACUUM_INSERT_SCALE_FACTOR})",
+        bounds,
+    )
+    
+    if not has_rows:
+        return 0
+    
+    cursor.execute(
+        f'INSERT INTO {partition} SELECT * FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s',
+        bounds,
+    )
+    moved = cursor.rowcount
+    cursor.execute(f'DELETE FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s', bounds)
+    cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+    return moved
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming and drop expired monthly partitions of the interactions table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=2,
+            help='Number of future months to create partitions for (default: 2)',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=90,
+            help='Drop partitions whose rows are all older than this many days (default: 90)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be created or dropped without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        months_ahead = options['months_ahead']
+        retention_days = options['retention_days']
+        dry_run = options['dry_run']
+        
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('Partitioning requires PostgreSQL, nothing to do'))
+            return
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+                [TABLE_NAME],
+            )
+            if cursor.fetchone() is None:
+                self.stdout.write(self.style.WARNING(
+                    f'{TABLE_NAME} is not partitioned, run partition_user_interactions.sql first'
+                ))
+                return
+            
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = to_regclass(%s)
+                """,
+                [TABLE_NAME],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            
+            # Create this month's partition and the upcoming ones
+            current_month = timezone.now().date().replace(day=1)
+            for offset in range(months_ahead + 1):
+                month_start = _add_months(current_month, offset)
+                name = _partition_name(month_start)
+                if name in existing:
+                    continue
+                
+                if dry_run:
+                    self.stdout.write(f'DRY RUN: Would create partition {name}')
+                    continue
+                
+                # One month failing must not stop the others or the cleanup
+                try:
+                    with transaction.atomic():
+                        moved = _create_partition(
+                            cursor, name, month_start, _add_months(month_start, 1),
+                            DEFAULT_PARTITION in existing,
+                        )
+                except DatabaseError as e:
+                    self.stdout.write(self.style.ERROR(f'Failed to create partition {name}: {e}'))
+                    logger.error(f'Failed to create interaction partition {name}: {e}', exc_info=True)
+                    continue
+                
+                self.stdout.write(self.style.SUCCESS(
+                    f'Created partition {name}' + (f' ({moved} rows moved from the default partition)' if moved else '')
+                ))
+                logger.info(f'Created interaction partition {name}, moved {moved} rows from the default partition')
+            
+            # Drop monthly partitions that end before the retention cutoff
+            cutoff = (timezone.now() - timedelta(days=retention_days)).date()
+            for name in sorted(existing):
+                try:
+                    month_start = date(int(name[-7:-3]), int(name[-2:]), 1)
+                except ValueError:
+                    # Not a monthly partition (e.g. the default partition)
+                    continue
+                if _add_months(month_start, 1) > cutoff:
+                    continue
+                
+                if dry_run:
+                    self.stdout.write(f'DRY RUN: Would drop partition {name}')
+                    continue
+                
+                cursor.execute(
+                    f'ALTER TABLE {connection.ops.quote_name(TABLE_NAME)} '
+                    f'DETACH PARTITION {connection.ops.quote_name(name)}'
+                )
+                cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+                self.stdout.write(self.style.SUCCESS(f'Dropped partition {name}'))
+                logger.info(f'Dropped interaction partition {name} (retention: {retention_days} days)')
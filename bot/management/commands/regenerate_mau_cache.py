@@ -3,7 +3,6 @@ Django management command to regenerate the monthly active users cache.
 This command clears the existing cache and recalculates the MAU count.
 """
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
 from bot.services.analytics_service import AnalyticsService
 import logging
 
@@ -37,11 +36,12 @@ class Command(BaseCommand):
             self.stdout.write('Cache will be regenerated on next request')
             return
         
-        # Regenerate the cache by calling get_monthly_active_users_count
+        # Recalculate and store the count in one call; the service reports
+        # whether the cache write succeeded so no read-back is needed
         self.stdout.write('Regenerating monthly active users count...')
         
         try:
-            mau_count = AnalyticsService.get_monthly_active_users_count()
+            mau_count, cached = AnalyticsService.refresh_monthly_active_users_count()
             formatted_count = AnalyticsService.format_user_count(mau_count)
             
             self.stdout.write(
@@ -52,15 +52,14 @@ class Command(BaseCommand):
             self.stdout.write(f'Monthly Active Users: {mau_count} ({formatted_count})')
             
             # Verify cache was set
-            cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
-            if cached_value == mau_count:
+            if cached:
                 self.stdout.write(
                     self.style.SUCCESS('✅ Cache verification passed')
                 )
             else:
                 self.stdout.write(
                     self.style.WARNING(
-                        f'⚠️  Cache verification failed: expected {mau_count}, got {cached_value}'
+                        f'⚠️  Cache verification failed: could not store {mau_count}'
                     )
                 )
             
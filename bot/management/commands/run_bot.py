@@ -3,9 +3,13 @@ from django.core.management import BaseCommand, CommandError
 from django.core.management.base import CommandParser
 
 from bot.bot import bot
+from bot.services.analytics_service import AnalyticsService
 
 
 class Command(BaseCommand):
     def handle(self, *args: Any, **options: Any):
         bot.remove_webhook()
+        # Polling runs in one long-lived process, so interactions can be
+        # batched; buffered rows are drained on exit
+        AnalyticsService.enable_interaction_buffering()
         bot.infinity_polling()
@@ -3,10 +3,13 @@ Django management command to manually update the monthly active users count.
 This command recalculates the MAU count and displays statistics.
 """
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import timedelta
-from bot.models import UserInteraction
 from bot.services.analytics_service import AnalyticsService
+from bot.tasks import (
+    collect_analytics_snapshot,
+    compute_analytics_snapshot,
+    get_analytics_snapshot,
+    refresh_interaction_type_snapshot,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,11 +29,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip caching the result',
         )
+        parser.add_argument(
+            '--refresh-snapshot',
+            action='store_true',
+            help='Recalculate the stored analytics snapshot (run daily from a scheduler)',
+        )
 
     def handle(self, *args, **options):
         """Execute the command"""
         verbose = options['verbose']
         no_cache = options['no_cache']
+        refresh_snapshot = options['refresh_snapshot']
         
         self.stdout.write('Calculating monthly active users count...')
         
@@ -49,54 +58,42 @@ class Command(BaseCommand):
                 )
             )
             
+            if refresh_snapshot:
+                compute_analytics_snapshot()
+                refresh_interaction_type_snapshot()
+                self.stdout.write(self.style.SUCCESS('✅ Analytics snapshot refreshed'))
+            
             if verbose:
                 # Display detailed statistics
                 self.stdout.write('\n' + '='*50)
                 self.stdout.write('DETAILED STATISTICS')
                 self.stdout.write('='*50)
                 
-                # Calculate time boundaries
-                now = timezone.now()
-                one_day_ago = now - timedelta(days=1)
-                seven_days_ago = now - timedelta(days=7)
-                thirty_days_ago = now - timedelta(days=30)
+                # Print from the precomputed snapshot when there is one
+                if no_cache:
+                    verbose_stats = collect_analytics_snapshot()
+                else:
+                    verbose_stats = get_analytics_snapshot() or compute_analytics_snapshot()
                 
-                # Daily active users
-                dau = UserInteraction.objects.filter(
-                    timestamp__gte=one_day_ago
-                ).values('user').distinct().count()
+                self.stdout.write(f'Snapshot generated at: {verbose_stats["generated_at"]}')
                 
-                # Weekly active users
-                wau = UserInteraction.objects.filter(
-                    timestamp__gte=seven_days_ago
-                ).values('user').distinct().count()
+                dau = verbose_stats['dau']
+                wau = verbose_stats['wau']
+                window_mau = verbose_stats['mau']
+                total_interactions = verbose_stats['total_30d']
+                interaction_types = verbose_stats['interaction_types']
                 
-                # Total interactions in last 30 days
-                total_interactions = UserInteraction.objects.filter(
-                    timestamp__gte=thirty_days_ago
-                ).count()
-                
-                # Interaction types breakdown
-                from django.db.models import Count
-                interaction_types = UserInteraction.objects.filter(
-                    timestamp__gte=thirty_days_ago
-                ).values('interaction_type').annotate(
-                    count=Count('id')
-                ).order_by('-count')
-                
-                self.stdout.write(f'\nDaily Active Users (24h): {dau}')
+                self.stdout.write(f'\nDaily Active Users (today): {dau}')
                 self.stdout.write(f'Weekly Active Users (7d): {wau}')
-                self.stdout.write(f'Monthly Active Users (30d): {mau_count}')
+                self.stdout.write(f'Monthly Active Users (30d): {window_mau}')
                 self.stdout.write(f'\nTotal Interactions (30d): {total_interactions}')
                 
-                if mau_count > 0:
-                    avg_interactions = total_interactions / mau_count
+                if window_mau > 0:
+                    avg_interactions = total_interactions / window_mau
                     self.stdout.write(f'Avg Interactions per User: {avg_interactions:.2f}')
                 
                 self.stdout.write('\nInteraction Types (30d):')
-                for item in interaction_types:
-                    interaction_type = item['interaction_type']
-                    count = item['count']
+                for interaction_type, count in interaction_types:
                     percentage = (count / total_interactions * 100) if total_interactions > 0 else 0
                     self.stdout.write(f'  {interaction_type}: {count} ({percentage:.1f}%)')
                 
@@ -105,8 +102,8 @@ class Command(BaseCommand):
                 self.stdout.write('ALL-TIME STATISTICS')
                 self.stdout.write('-'*50)
                 
-                total_users = UserInteraction.objects.values('user').distinct().count()
-                total_all_time = UserInteraction.objects.count()
+                total_users = verbose_stats['users_all']
+                total_all_time = verbose_stats['total_all']
                 
                 self.stdout.write(f'Total Users (all-time): {total_users}')
                 self.stdout.write(f'Total Interactions (all-time): {total_all_time}')
@@ -116,13 +113,10 @@ class Command(BaseCommand):
                     self.stdout.write(f'Avg Interactions per User (all-time): {avg_all_time:.2f}')
                 
                 # Oldest and newest interactions
-                oldest = UserInteraction.objects.order_by('timestamp').first()
-                newest = UserInteraction.objects.order_by('-timestamp').first()
-                
-                if oldest:
-                    self.stdout.write(f'\nOldest Interaction: {oldest.timestamp}')
-                if newest:
-                    self.stdout.write(f'Newest Interaction: {newest.timestamp}')
+                if verbose_stats['oldest']:
+                    self.stdout.write(f'\nOldest Interaction: {verbose_stats["oldest"]}')
+                if verbose_stats['newest']:
+                    self.stdout.write(f'Newest Interaction: {verbose_stats["newest"]}')
                 
                 self.stdout.write('='*50 + '\n')
             
@@ -0,0 +1,57 @@
+# Generated manually for UserInteractionDailyActive rollup table
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_daily_active(apps, schema_editor):
+    """Roll existing interactions up into one row per user per day."""
+    UserInteraction = apps.get_model('bot', 'UserInteraction')
+    UserInteractionDailyActive = apps.get_model('bot', 'UserInteractionDailyActive')
+    
+    rows = UserInteraction.objects.annotate(
+        day=TruncDate('timestamp')
+    ).values('user_id', 'day').annotate(
+        interaction_count=Count('id')
+    ).order_by()
+    
+    UserInteractionDailyActive.objects.bulk_create(
+        [
+            UserInteractionDailyActive(
+                user_id=row['user_id'],
+                date=row['day'],
+                interaction_count=row['interaction_count'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0007_ad_resumable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserInteractionDailyActive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('interaction_count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='bot.user')),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='userinteractiondailyactive',
+            index=models.Index(fields=['date'], name='bot_userint_date_6d7749_idx'),
+        ),
+        migrations.RunPython(backfill_daily_active, migrations.RunPython.noop),
+    ]
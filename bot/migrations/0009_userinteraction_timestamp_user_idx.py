@@ -0,0 +1,17 @@
+# Generated manually for the UserInteraction (timestamp, user) index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0008_userinteractiondailyactive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userinteraction',
+            index=models.Index(fields=['timestamp', 'user'], name='bot_userint_timesta_b0071e_idx'),
+        ),
+    ]
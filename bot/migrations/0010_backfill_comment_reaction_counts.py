@@ -0,0 +1,35 @@
+# Generated manually to resync Comment reaction counters with Reaction rows
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    """Recount like/dislike/report totals in a single UPDATE."""
+    Comment = apps.get_model('bot', 'Comment')
+    Reaction = apps.get_model('bot', 'Reaction')
+    
+    def count_of(reaction_type):
+        counts = Reaction.objects.filter(
+            comment=OuterRef('pk'),
+            reaction_type=reaction_type,
+        ).order_by().values('comment').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    
+    Comment.objects.update(
+        like_count=count_of('like'),
+        dislike_count=count_of('dislike'),
+        report_count=count_of('report'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0009_userinteraction_timestamp_user_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated manually for a BRIN index on UserInteraction.timestamp (PostgreSQL only)
+
+from django.db import migrations
+
+
+BRIN_INDEX_NAME = 'bot_ui_ts_brin'
+
+
+def _brin_index():
+    from django.contrib.postgres.indexes import BrinIndex
+    return BrinIndex(fields=['timestamp'], name=BRIN_INDEX_NAME, pages_per_range=32)
+
+
+def add_brin_index(apps, schema_editor):
+    """Add the BRIN index; other backends keep using the B-tree indexes."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    UserInteraction = apps.get_model('bot', 'UserInteraction')
+    schema_editor.add_index(UserInteraction, _brin_index())
+
+
+def remove_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    UserInteraction = apps.get_model('bot', 'UserInteraction')
+    schema_editor.remove_index(UserInteraction, _brin_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0010_backfill_comment_reaction_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_brin_index, remove_brin_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated manually so buffered UserInteraction writes can set timestamp
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0011_userinteraction_timestamp_brin'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userinteraction',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated manually to drop the timestamp-only UserInteraction index,
+# which the (timestamp, user) index from 0009 already covers
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0012_alter_userinteraction_timestamp'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='userinteraction',
+            name='bot_userint_timesta_8990d2_idx',
+        ),
+    ]
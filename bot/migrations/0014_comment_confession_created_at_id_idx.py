@@ -0,0 +1,17 @@
+# Generated manually for the Comment (confession, created_at, id) keyset pagination index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0013_remove_userinteraction_timestamp_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['confession', 'created_at', 'id'], name='bot_comment_confess_c7d671_idx'),
+        ),
+    ]
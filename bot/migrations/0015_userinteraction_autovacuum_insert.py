@@ -0,0 +1,70 @@
+# Generated manually to vacuum UserInteraction after inserts (PostgreSQL only)
+
+from django.db import migrations
+
+
+# bot_userinteraction is append-only, so it is rarely vacuumed for dead rows.
+# Without vacuums its visibility map goes stale and index-only scans on the
+# (timestamp, user) index fall back to heap fetches.
+# Vacuum once 2% of the table is newly inserted (PostgreSQL 13+). Once the
+# table is partitioned, partition_user_interactions.sql and the
+# manage_interaction_partitions command set this on each new partition.
+INSERT_SCALE_FACTOR = 0.02
+
+
+def _leaf_tables(schema_editor, table_name):
+    """
+    The tables that take storage parameters for table_name.
+    
+    PostgreSQL rejects them on a partitioned parent (see
+    partition_user_interactions.sql), so there they go on each partition.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [table_name],
+        )
+        if cursor.fetchone() is None:
+            return [table_name]
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_partition_tree(to_regclass(%s)) tree
+            JOIN pg_class child ON child.oid = tree.relid
+            WHERE tree.isleaf
+            """,
+            [table_name],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def set_autovacuum_insert_scale_factor(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    UserInteraction = apps.get_model('bot', 'UserInteraction')
+    for table in _leaf_tables(schema_editor, UserInteraction._meta.db_table):
+        schema_editor.execute(
+            f"ALTER TABLE {schema_editor.quote_name(table)} "
+            f"SET (autovacuum_vacuum_insert_scale_factor = {INSERT_SCALE_FACTOR})"
+        )
+
+
+def reset_autovacuum_insert_scale_factor(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    UserInteraction = apps.get_model('bot', 'UserInteraction')
+    for table in _leaf_tables(schema_editor, UserInteraction._meta.db_table):
+        schema_editor.execute(
+            f"ALTER TABLE {schema_editor.quote_name(table)} RESET (autovacuum_vacuum_insert_scale_factor)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0014_comment_confession_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_autovacuum_insert_scale_factor, reset_autovacuum_insert_scale_factor),
+    ]
@@ -0,0 +1,35 @@
+# Generated manually for the denormalized Confession.comment_count
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_counts(apps, schema_editor):
+    """Count existing comments and replies in a single UPDATE."""
+    Confession = apps.get_model('bot', 'Confession')
+    Comment = apps.get_model('bot', 'Comment')
+    
+    counts = Comment.objects.filter(
+        confession=OuterRef('pk'),
+    ).order_by().values('confession').annotate(total=Count('id')).values('total')
+    
+    Confession.objects.update(
+        comment_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0015_userinteraction_autovacuum_insert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='confession',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated manually for the InteractionTypeSnapshot table
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0016_confession_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionTypeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interaction_type', models.CharField(max_length=50, unique=True)),
+                ('count', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated manually for a partial index over pending confessions
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0017_interactiontypesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='confession',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='bot_confession_pending_idx'),
+        ),
+    ]
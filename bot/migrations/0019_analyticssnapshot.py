@@ -0,0 +1,29 @@
+# Generated manually for the AnalyticsSnapshot table
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0018_confession_pending_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dau', models.IntegerField(default=0)),
+                ('wau', models.IntegerField(default=0)),
+                ('mau', models.IntegerField(default=0)),
+                ('total_30d', models.IntegerField(default=0)),
+                ('total_all', models.IntegerField(default=0)),
+                ('users_all', models.IntegerField(default=0)),
+                ('oldest', models.DateTimeField(blank=True, null=True)),
+                ('newest', models.DateTimeField(blank=True, null=True)),
+                ('interaction_types', models.JSONField(default=list)),
+                ('generated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
@@ -18,6 +22,15 @@ class User(AbstractUser):
         ]
 
 
+# with_users() joins the related users a listing will display, instead of
+# one query per row when .user/.reviewed_by are read.
+
+class FeedbackQuerySet(models.QuerySet):
+    def with_users(self):
+        """Join the submitting user and reviewing admin."""
+        return self.select_related('user', 'reviewed_by')
+
+
 class Confession(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -33,12 +46,17 @@ class Confession(models.Model):
     reviewed_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='reviewed_confessions')
     created_at = models.DateTimeField(auto_now_add=True)
     reviewed_at = models.DateTimeField(null=True, blank=True)
+    # Comments and replies on this confession, kept by the Comment signals
+    comment_count = models.IntegerField(default=0)
 
     class Meta:
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['created_at']),
+            # Moderation queue (get_pending_confessions): only pending rows,
+            # already in created_at order
+            models.Index(fields=['created_at'], name='bot_confession_pending_idx', condition=Q(status='pending')),
         ]
         ordering = ['-created_at']
 
@@ -57,6 +75,8 @@ class Comment(models.Model):
         indexes = [
             models.Index(fields=['confession']),
             models.Index(fields=['created_at']),
+            # Keyset pagination of a confession's comments (see get_comments)
+            models.Index(fields=['confession', 'created_at', 'id']),
         ]
         ordering = ['-created_at']
 
@@ -82,6 +102,67 @@ class Reaction(models.Model):
         ]
 
 
+# Keep Comment.like_count/dislike_count/report_count in step with the
+# Reaction rows using single UPDATE statements, so readers never recount.
+# Note that bulk_create() and QuerySet.update() bypass these signals.
+
+@receiver(post_init, sender=Reaction)
+def remember_reaction_type(sender, instance, **kwargs):
+    """Remember the loaded reaction type so a later save can move the counter."""
+    # Read from __dict__ so a deferred field doesn't trigger a query
+    instance._loaded_reaction_type = instance.__dict__.get('reaction_type')
+
+
+@receiver(post_save, sender=Reaction)
+def increment_reaction_counter(sender, instance, created, raw=False, **kwargs):
+    """Increment the comment counter for a new or switched reaction."""
+    if raw:
+        return
+    
+    previous_type = None if created else instance._loaded_reaction_type
+    if previous_type == instance.reaction_type:
+        return
+    
+    counter_updates = {
+        f'{instance.reaction_type}_count': F(f'{instance.reaction_type}_count') + 1
+    }
+    if previous_type:
+        # Switching type in place moves the count, never dropping below zero
+        counter_updates[f'{previous_type}_count'] = Greatest(F(f'{previous_type}_count') - 1, 0)
+    
+    Comment.objects.filter(pk=instance.comment_id).update(**counter_updates)
+    instance._loaded_reaction_type = instance.reaction_type
+
+
+@receiver(post_delete, sender=Reaction)
+def decrement_reaction_counter(sender, instance, **kwargs):
+    """Decrement the comment counter for a removed reaction."""
+    count_field = f'{instance.reaction_type}_count'
+    Comment.objects.filter(pk=instance.comment_id).update(
+        **{count_field: Greatest(F(count_field) - 1, 0)}
+    )
+
+
+# Keep Confession.comment_count in step with its Comment rows the same way.
+
+@receiver(post_save, sender=Comment)
+def increment_comment_counter(sender, instance, created, raw=False, **kwargs):
+    """Count a new comment or reply on its confession."""
+    if raw or not created:
+        return
+    Confession.objects.filter(pk=instance.confession_id).update(
+        comment_count=F('comment_count') + 1
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_counter(sender, instance, **kwargs):
+    """Uncount a removed comment or reply."""
+    Confession.objects.filter(pk=instance.confession_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0)
+    )
+
+
 
 class Feedback(models.Model):
     STATUS_CHOICES = [
@@ -98,6 +179,8 @@ class Feedback(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     admin_notes = models.TextField(max_length=1000, blank=True, default='')
 
+    objects = FeedbackQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=['status']),
@@ -148,11 +231,79 @@ class UserInteraction(models.Model):
     - Used only for anonymous aggregate reporting
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interactions')
+    # Kept as text rather than a small-integer choice: types are built at
+    # runtime (command_<name>, button_<name>), so there is no fixed choice
+    # set, and PostgreSQL only stores a varchar's actual length (~10-25 bytes)
     interaction_type = models.CharField(max_length=50)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so buffered writes keep the time
+    # the interaction happened, not the time of the bulk insert
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         indexes = [
             models.Index(fields=['user', 'timestamp']),
-            models.Index(fields=['timestamp']),
+            # Lets DAU/WAU/MAU range scans read user_id from the index alone
+            # (index-only scan), and serves timestamp-only range filters
+            # through its leading column. B-trees scan both ways, so it also
+            # covers newest-first reads. Queries only benefit while they select
+            # user alone (values('user')); migration 0015 keeps the visibility
+            # map fresh for this append-only table.
+            models.Index(fields=['timestamp', 'user']),
         ]
+        # A BRIN index on timestamp (bot_ui_ts_brin) is added on PostgreSQL
+        # only, by migration 0011, so it is not declared here.
+
+
+class UserInteractionDailyActive(models.Model):
+    """
+    Daily rollup of UserInteraction: one row per user per day they were active.
+    
+    Distinct-user metrics (DAU/WAU) count over at most one row per user per
+    day instead of scanning every raw interaction. Rows are maintained by
+    AnalyticsService.track_user_interaction and follow the same privacy
+    rules as UserInteraction (no content, metadata only), including its
+    retention cleanup (AnalyticsService.delete_interactions_before).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    interaction_count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('user', 'date')
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+
+class InteractionTypeSnapshot(models.Model):
+    """
+    Periodic snapshot of all-time interaction counts per interaction type.
+    
+    Refreshed by bot.tasks.refresh_interaction_type_snapshot so the admin
+    analytics report reads a handful of rows instead of grouping every
+    UserInteraction. Aggregate counts only, no user references.
+    """
+    interaction_type = models.CharField(max_length=50, unique=True)
+    count = models.IntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    Precomputed detailed analytics statistics.
+    
+    A single row written by bot.tasks.compute_analytics_snapshot, so every
+    process (serverless workers included) can print the statistics without
+    rescanning the interaction tables. Aggregate counts only, no user
+    references.
+    """
+    dau = models.IntegerField(default=0)
+    wau = models.IntegerField(default=0)
+    mau = models.IntegerField(default=0)
+    total_30d = models.IntegerField(default=0)
+    total_all = models.IntegerField(default=0)
+    users_all = models.IntegerField(default=0)
+    oldest = models.DateTimeField(null=True, blank=True)
+    newest = models.DateTimeField(null=True, blank=True)
+    interaction_types = models.JSONField(default=list)
+    generated_at = models.DateTimeField()
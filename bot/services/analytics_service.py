@@ -3,20 +3,130 @@ Analytics service for tracking user interactions and calculating monthly active
 This is a minimal implementation for the monthly users count feature.
 """
 
+import atexit
+import functools
+import random
+import threading
+import time
+from collections import Counter, deque
 from datetime import datetime, timedelta
+from django.conf import settings
 from django.utils import timezone
 from django.core.cache import cache
-from bot.models import User
+from django.db import IntegrityError, InterfaceError, OperationalError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Q
+from bot.models import InteractionTypeSnapshot, User, UserInteraction, UserInteractionDailyActive
+from bot.services.user_service import forget_cached_user_pk
+from bot.utils import estimate_row_count
 import logging
 
+try:
+    from telebot import TeleBot
+except ImportError:  # Only needed to update the bot description
+    TeleBot = None
+
 logger = logging.getLogger(__name__)
 
+# Buffered (user_id, interaction_type, timestamp) tuples waiting for
+# AnalyticsService.flush_interactions()
+_interaction_buffer = deque()
+_interaction_buffer_lock = threading.Lock()
+_interaction_flusher = None
+# After a transient flush failure, record_interaction leaves retries to the
+# background flusher until this time.monotonic() value
+_interaction_flush_retry_at = 0.0
+
+# TeleBot reused across description updates (see _get_bot_instance)
+_bot_instance = None
+_bot_instance_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _format_user_count_cached(count):
+    if count < 1000:
+        return str(count)
+    elif count < 1000000:
+        return f"{count/1000:.1f}K"
+    else:
+        return f"{count/1000000:.1f}M"
+
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _format_display_cached(count, config_items):
+    config = dict(config_items)
+    
+    # Handle low count hiding
+    if config.get('hide_low_counts', False):
+        threshold = config.get('low_count_threshold', 10)
+        if count < threshold:
+            return ''
+    
+    # Format the count based on format setting
+    if config.get('format') == 'full':
+        formatted_count = str(count)
+    else:  # abbreviated
+        formatted_count = _format_user_count_cached(count)
+    
+    # Build the display string
+    if config.get('show_label', True):
+        label = config.get('label', 'monthly active users')
+        if config.get('position') == 'separate_line':
+            return f"{label}\n{formatted_count}"
+        else:  # inline
+            return f"{formatted_count} {label}"
+    else:
+        return formatted_count
+
 
 class AnalyticsService:
     """Service for handling user analytics and monthly active user calculations."""
     
+    # The MAU value lives under a versioned key (see mau_cache_key); the
+    # lock and stale copy use the versioned and base names respectively
     CACHE_KEY_MAU = 'monthly_active_users_count'
+    CACHE_KEY_MAU_VERSION = 'monthly_active_users_count:version'
     CACHE_TIMEOUT = 3600  # 1 hour
+    CACHE_TIMEOUT_JITTER = 0.2  # timeouts vary by +/-10% so keys don't expire together
+    CACHE_KEY_TOTAL_USERS = 'total_registered_users_count'
+    
+    # Single-flight recomputation: one caller holds LOCK_SUFFIX while it
+    # recomputes, the others wait briefly for it, then serve the last good
+    # value kept under STALE_SUFFIX
+    LOCK_SUFFIX = ':lock'
+    LOCK_TIMEOUT = 30  # seconds
+    LOCK_WAIT = 2  # seconds
+    LOCK_POLL_INTERVAL = 0.1  # seconds
+    STALE_SUFFIX = ':stale'
+    STALE_TIMEOUT = 86400  # 1 day
+    
+    # Below this many rows the planner's estimate is too rough, count exactly
+    ESTIMATE_MIN_ROWS = 1000
+    
+    # The admin report reads the interaction type breakdown from
+    # InteractionTypeSnapshot while it is at most this old (daily refresh)
+    INTERACTION_TYPE_SNAPSHOT_MAX_AGE = 25 * 3600  # seconds
+    
+    # Buffered interaction writes (see record_interaction). Long-running
+    # processes such as run_bot turn them on with enable_interaction_buffering.
+    buffer_interactions = False
+    INTERACTION_BUFFER_SIZE = 500
+    INTERACTION_FLUSH_INTERVAL = 5  # seconds
+    # Rows kept for retry while the database is unavailable
+    INTERACTION_BUFFER_LIMIT = 10000
+    
+    # Repeats of the same low-value interaction by the same user within
+    # this window (a burst of navigation or reaction taps) are recorded
+    # once. Every other type is always recorded.
+    INTERACTION_DEDUPE_TYPES = frozenset({
+        'button_view_comments',
+        'button_comments_page',
+        'button_like_comment',
+        'button_dislike_comment',
+        'button_back_to_menu',
+        'button_back_to_main',
+    })
+    INTERACTION_DEDUPE_PREFIX = 'interaction_seen:'
+    INTERACTION_DEDUPE_WINDOW = 1  # seconds
     
     # Display configuration defaults
     DEFAULT_DISPLAY_CONFIG = {
@@ -44,10 +154,12 @@ class AnalyticsService:
         Returns:
             int: Number of unique active users in the last 30 days
         """
+        cache_key = AnalyticsService.mau_cache_key()
+        
         # Check cache first (with error handling)
         cached_count = None
         try:
-            cached_count = cache.get(AnalyticsService.CACHE_KEY_MAU)
+            cached_count = cache.get(cache_key)
             if cached_count is not None:
                 logger.info(f"Returning cached MAU count: {cached_count}")
                 return cached_count
@@ -55,46 +167,90 @@ class AnalyticsService:
             logger.warning(f"Cache get failed, falling back to database: {e}")
         
         try:
-            from bot.models import UserInteraction
-            
-            # Calculate 30 days ago
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            
-            # Get count of unique users who have interactions in the last 30 days
-            mau_count = UserInteraction.objects.filter(
-                timestamp__gte=thirty_days_ago
-            ).values('user').distinct().count()
-            
-            # Try to cache the result for 1 hour (with error handling)
-            try:
-                cache.set(AnalyticsService.CACHE_KEY_MAU, mau_count, AnalyticsService.CACHE_TIMEOUT)
-            except Exception as cache_error:
-                logger.warning(f"Cache set failed: {cache_error}")
-            
-            logger.info(f"Calculated MAU count: {mau_count}")
-            return mau_count
+            return AnalyticsService._single_flight(
+                cache_key,
+                lambda: AnalyticsService.refresh_monthly_active_users_count()[0],
+                stale_key=AnalyticsService.CACHE_KEY_MAU,
+            )
             
         except Exception as e:
             logger.error(f"Error calculating monthly active users: {e}", exc_info=True)
-            # If we have a cached value from earlier, return it
-            if cached_count is not None:
-                logger.info(f"Returning stale cached value due to database error: {cached_count}")
-                return cached_count
+            # If we have a value from an earlier calculation, return it
+            stale_count = AnalyticsService._get_stale(AnalyticsService.CACHE_KEY_MAU)
+            if stale_count is not None:
+                logger.info(f"Returning stale cached value due to database error: {stale_count}")
+                return stale_count
             # Return a fallback count
             return 0
     
+    @staticmethod
+    def refresh_monthly_active_users_count():
+        """
+        Recalculate the monthly active users count and store it in the cache.
+        
+        Always queries the database. Cache write failures are logged and
+        reported through the return value instead of being raised.
+        
+        Returns:
+            tuple: (count, cached) where cached is False if the cache write failed
+        
+        Raises:
+            Exception: If the database query fails
+        """
+        # Calculate 30 days ago
+        thirty_days_ago = timezone.now() - timedelta(days=30)
+        
+        # Get count of unique users who have interactions in the last 30 days.
+        # UserInteraction stays the source of truth rather than a denormalized
+        # User.last_active_at: rows written by bulk_create() or backdated with
+        # update() would never reach such a column, and this runs at most once
+        # per cache timeout.
+        mau_count = AnalyticsService._count_distinct_users(
+            UserInteraction.objects.filter(timestamp__gte=thirty_days_ago)
+        )
+        
+        # Try to cache the result for 1 hour (with error handling)
+        cached = AnalyticsService._cache_with_stale(
+            AnalyticsService.mau_cache_key(),
+            mau_count,
+            stale_key=AnalyticsService.CACHE_KEY_MAU,
+        )
+        
+        logger.info(f"Calculated MAU count: {mau_count}")
+        return mau_count, cached
+    
+    @staticmethod
+    def _count_distinct_users(queryset):
+        """
+        Count the distinct users in an interaction queryset.
+        
+        On PostgreSQL this uses DISTINCT ON (user_id), which the planner can
+        satisfy from the (user, timestamp) index instead of hash-aggregating
+        every matching row. Other backends use a plain DISTINCT.
+        
+        Args:
+            queryset: QuerySet of UserInteraction rows
+        
+        Returns:
+            int: Number of distinct users
+        """
+        if connection.vendor == 'postgresql':
+            return queryset.order_by('user').distinct('user').count()
+        return queryset.values('user').distinct().count()
+    
     @staticmethod
     def get_total_registered_users_count():
         """
         Get the total count of all registered users.
         
-        Returns the total number of users in the database.
+        Returns the total number of users in the database. On PostgreSQL
+        large tables use the planner's row estimate instead of a full count.
         Uses caching with 1-hour timeout for efficiency.
         
         Returns:
             int: Total number of registered users
         """
-        cache_key = 'total_registered_users_count'
+        cache_key = AnalyticsService.CACHE_KEY_TOTAL_USERS
         
         # Check cache first
         cached_count = None
@@ -106,28 +262,143 @@ class AnalyticsService:
         except Exception as e:
             logger.warning(f"Cache get failed, falling back to database: {e}")
         
-        try:
-            # Get total count of all users
-            total_count = User.objects.count()
+        def calculate_total_count():
+            # Get total count of all users; the estimate is plenty for an
+            # abbreviated "1.2K users" figure
+            total_count = estimate_row_count(User, min_rows=AnalyticsService.ESTIMATE_MIN_ROWS)
             
             # Try to cache the result for 1 hour
-            try:
-                cache.set(cache_key, total_count, AnalyticsService.CACHE_TIMEOUT)
-            except Exception as cache_error:
-                logger.warning(f"Cache set failed: {cache_error}")
+            AnalyticsService._cache_with_stale(cache_key, total_count)
             
             logger.info(f"Calculated total users count: {total_count}")
             return total_count
+        
+        try:
+            return AnalyticsService._single_flight(cache_key, calculate_total_count)
             
         except Exception as e:
             logger.error(f"Error calculating total registered users: {e}", exc_info=True)
-            # If we have a cached value from earlier, return it
-            if cached_count is not None:
-                logger.info(f"Returning stale cached value due to database error: {cached_count}")
-                return cached_count
+            # If we have a value from an earlier calculation, return it
+            stale_count = AnalyticsService._get_stale(cache_key)
+            if stale_count is not None:
+                logger.info(f"Returning stale cached value due to database error: {stale_count}")
+                return stale_count
             # Return a fallback count
             return 0
     
+    @staticmethod
+    def mau_cache_key():
+        """
+        Get the cache key the current MAU value is stored under.
+        
+        clear_cache() bumps the version instead of deleting the key, so every
+        process switches to the new key at once and old values simply expire.
+        
+        Returns:
+            str: Versioned cache key
+        """
+        try:
+            version = cache.get(AnalyticsService.CACHE_KEY_MAU_VERSION, 0)
+        except Exception as e:
+            logger.warning(f"Cache get failed for MAU cache version: {e}")
+            version = 0
+        return f"{AnalyticsService.CACHE_KEY_MAU}:v{version}"
+    
+    @staticmethod
+    def _single_flight(cache_key, calculate, stale_key=None):
+        """
+        Recalculate a cached value with at most one caller doing the work.
+        
+        The caller that wins the lock runs `calculate`. Others poll the cache
+        for up to LOCK_WAIT seconds, then serve the stale copy. If there is
+        no stale copy or the cache is unavailable, they calculate as well.
+        
+        Args:
+            cache_key (str): Key the calculated value is cached under
+            calculate (callable): Recalculates, caches and returns the value
+            stale_key (str, optional): Key the stale copy is kept under
+                (default: cache_key)
+        
+        Returns:
+            The cached or calculated value
+        
+        Raises:
+            Exception: If `calculate` fails
+        """
+        lock_key = cache_key + AnalyticsService.LOCK_SUFFIX
+        try:
+            acquired = cache.add(lock_key, 1, AnalyticsService.LOCK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Cache lock failed, calculating without it: {e}")
+            return calculate()
+        
+        if not acquired:
+            try:
+                deadline = time.monotonic() + AnalyticsService.LOCK_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(AnalyticsService.LOCK_POLL_INTERVAL)
+                    value = cache.get(cache_key)
+                    if value is not None:
+                        return value
+                
+                value = cache.get((stale_key or cache_key) + AnalyticsService.STALE_SUFFIX)
+                if value is not None:
+                    logger.info(f"Returning stale value for {cache_key} while it is recalculated")
+                    return value
+            except Exception as e:
+                logger.warning(f"Cache get failed while waiting for {cache_key}: {e}")
+            return calculate()
+        
+        try:
+            return calculate()
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception as e:
+                logger.warning(f"Failed to release cache lock {lock_key}: {e}")
+    
+    @staticmethod
+    def _cache_with_stale(cache_key, value, stale_key=None):
+        """
+        Cache a value for about CACHE_TIMEOUT plus a long-lived stale copy.
+        
+        The stale copy is kept under stale_key (default: cache_key) plus
+        STALE_SUFFIX.
+        
+        Returns:
+            bool: False if the cache write failed
+        """
+        try:
+            cache.set(cache_key, value, AnalyticsService._jittered_ttl(AnalyticsService.CACHE_TIMEOUT))
+            cache.set((stale_key or cache_key) + AnalyticsService.STALE_SUFFIX, value, AnalyticsService.STALE_TIMEOUT)
+            return True
+        except Exception as cache_error:
+            logger.warning(f"Cache set failed: {cache_error}")
+            return False
+    
+    @staticmethod
+    def _jittered_ttl(base):
+        """
+        Spread a cache timeout uniformly over base +/- CACHE_TIMEOUT_JITTER / 2.
+        
+        Args:
+            base (int): Timeout in seconds
+        
+        Returns:
+            int: Randomized timeout in seconds
+        """
+        jitter = AnalyticsService.CACHE_TIMEOUT_JITTER
+        return int(base - base * jitter / 2 + base * jitter * random.random())
+    
+    @staticmethod
+    def _get_stale(cache_key):
+        """Get the stale copy of a cached value, or None."""
+        try:
+            return cache.get(cache_key + AnalyticsService.STALE_SUFFIX)
+        except Exception as e:
+            logger.warning(f"Cache get failed for stale {cache_key}: {e}")
+            return None
+    
     @staticmethod
     def format_user_count(count):
         """
@@ -139,12 +410,9 @@ class AnalyticsService:
         Returns:
             str: Formatted count string (e.g., "1.2K", "5.3M")
         """
-        if count < 1000:
-            return str(count)
-        elif count < 1000000:
-            return f"{count/1000:.1f}K"
-        else:
-            return f"{count/1000000:.1f}M"
+        # Counts only change when the cached MAU/total is recalculated, so
+        # the same few values are formatted over and over
+        return _format_user_count_cached(count)
     
     @staticmethod
     def format_display(count, config=None):
@@ -173,46 +441,31 @@ class AnalyticsService:
             merged_config.update(config)
             config = merged_config
         
-        # Handle low count hiding
-        if config.get('hide_low_counts', False):
-            threshold = config.get('low_count_threshold', 10)
-            if count < threshold:
-                return ''
-        
-        # Format the count based on format setting
-        if config.get('format') == 'full':
-            formatted_count = str(count)
-        else:  # abbreviated
-            formatted_count = AnalyticsService.format_user_count(count)
-        
-        # Build the display string
-        if config.get('show_label', True):
-            label = config.get('label', 'monthly active users')
-            if config.get('position') == 'separate_line':
-                return f"{label}\n{formatted_count}"
-            else:  # inline
-                return f"{formatted_count} {label}"
-        else:
-            return formatted_count
+        # Memoized on the merged config; unhashable option values skip the cache
+        try:
+            return _format_display_cached(count, frozenset(config.items()))
+        except TypeError:
+            return _format_display_cached.__wrapped__(count, config.items())
     
     @staticmethod
-    def track_user_interaction(user, interaction_type, max_retries=2):
+    def track_user_interaction(user, interaction_type, max_retries=2, telegram_id=None):
         """
         Track a user interaction by creating a UserInteraction record.
         
         Implements retry logic with exponential backoff for transient failures.
+        An IntegrityError means the user row is gone; it is not retried, and
+        the user's cached primary key is dropped so later updates look it up
+        again.
         
         Args:
-            user: User instance
+            user: User instance or primary key
             interaction_type (str): Type of interaction (message, command, button_click, etc.)
             max_retries (int): Maximum number of retry attempts (default: 2)
+            telegram_id (int): Telegram ID the user id was looked up by, if any
         
         Returns:
             UserInteraction: The created interaction record, or None if failed
         """
-        from bot.models import UserInteraction
-        import time
-        
         # Validate inputs
         if user is None:
             logger.warning("Cannot track interaction: user is None")
@@ -222,15 +475,23 @@ class AnalyticsService:
             logger.warning("Cannot track interaction: interaction_type is empty")
             return None
         
+        user_id = getattr(user, 'pk', user)
+        
         # Attempt to create the interaction with retry logic
         for attempt in range(max_retries + 1):
             try:
                 interaction = UserInteraction.objects.create(
-                    user=user,
+                    user_id=user_id,
                     interaction_type=interaction_type
                 )
-                logger.info(f"User interaction tracked: {user.id} - {interaction_type}")
+                logger.info(f"User interaction tracked: {user_id} - {interaction_type}")
+                AnalyticsService.record_daily_activity(user_id, timezone.localdate(interaction.timestamp))
                 return interaction
+            except IntegrityError as e:
+                logger.warning(f"Dropping interaction of missing user {user_id}: {e}")
+                if telegram_id is not None:
+                    forget_cached_user_pk(telegram_id)
+                return None
             except Exception as e:
                 logger.error(f"Error tracking user interaction (attempt {attempt + 1}/{max_retries + 1}): {e}", exc_info=True)
                 
@@ -244,15 +505,235 @@ class AnalyticsService:
                     logger.error(f"Failed to track interaction after {max_retries + 1} attempts")
                     return None
     
+    @staticmethod
+    def claim_interaction(telegram_id, interaction_type):
+        """
+        Check whether an interaction is the first of its burst.
+        
+        Only types in INTERACTION_DEDUPE_TYPES are deduplicated; anything
+        else is always recorded without a cache round trip. For those types
+        cache.add lets only the first call per user and interaction type
+        within INTERACTION_DEDUPE_WINDOW seconds win, so interaction totals
+        and the per-type breakdown count a burst of them as one tap.
+        Active-user counts only depend on one interaction per user per day
+        and are unchanged.
+        
+        Args:
+            telegram_id (int): Telegram user ID
+            interaction_type (str): Type of interaction
+        
+        Returns:
+            bool: True if the interaction should be recorded. Also True if
+            the cache is unavailable.
+        """
+        if interaction_type not in AnalyticsService.INTERACTION_DEDUPE_TYPES:
+            return True
+        
+        key = f"{AnalyticsService.INTERACTION_DEDUPE_PREFIX}{telegram_id}:{interaction_type}"
+        try:
+            return cache.add(key, 1, AnalyticsService.INTERACTION_DEDUPE_WINDOW)
+        except Exception as e:
+            logger.warning(f"Cache add failed, recording interaction anyway: {e}")
+            return True
+    
+    @staticmethod
+    def enable_interaction_buffering():
+        """
+        Buffer tracked interactions and flush them from a background thread.
+        
+        The daemon thread starts once per process and flushes every
+        INTERACTION_FLUSH_INTERVAL seconds, so rows don't wait in the buffer
+        for the next interaction during quiet periods.
+        """
+        global _interaction_flusher
+        
+        AnalyticsService.buffer_interactions = True
+        
+        with _interaction_buffer_lock:
+            if _interaction_flusher is not None:
+                return
+            _interaction_flusher = threading.Thread(
+                target=AnalyticsService._run_interaction_flusher,
+                name='interaction-flusher',
+                daemon=True,
+            )
+        _interaction_flusher.start()
+    
+    @staticmethod
+    def _run_interaction_flusher():
+        while True:
+            time.sleep(AnalyticsService.INTERACTION_FLUSH_INTERVAL)
+            close_old_connections()
+            try:
+                AnalyticsService.flush_interactions()
+            except Exception as e:
+                logger.error(f"Background interaction flush failed: {e}", exc_info=True)
+    
+    @staticmethod
+    def record_interaction(user_id, interaction_type, telegram_id=None):
+        """
+        Buffer a user interaction for a later bulk insert.
+        
+        The buffer is written with a single bulk_create once it holds
+        INTERACTION_BUFFER_SIZE rows or its oldest row is older than
+        INTERACTION_FLUSH_INTERVAL seconds, by the background flusher (see
+        enable_interaction_buffering), and when the process exits. The
+        caller's thread only flushes when no flush failed within the last
+        INTERACTION_FLUSH_INTERVAL seconds.
+        Only use this from long-running processes (e.g. run_bot); a
+        serverless worker can be frozen with rows still buffered.
+        
+        Args:
+            user_id (int): Primary key of the interacting User
+            interaction_type (str): Type of interaction (message, command, button_click, etc.)
+            telegram_id (int): Telegram ID the user id was looked up by, if any
+        """
+        now = timezone.now()
+        with _interaction_buffer_lock:
+            _interaction_buffer.append((user_id, interaction_type, now, telegram_id))
+            should_flush = time.monotonic() >= _interaction_flush_retry_at and (
+                len(_interaction_buffer) >= AnalyticsService.INTERACTION_BUFFER_SIZE
+                or (now - _interaction_buffer[0][2]).total_seconds()
+                >= AnalyticsService.INTERACTION_FLUSH_INTERVAL
+            )
+        
+        if should_flush:
+            AnalyticsService.flush_interactions()
+    
+    @staticmethod
+    def flush_interactions():
+        """
+        Write all buffered interactions to the database.
+        
+        Failures are logged rather than raised, so analytics never break bot
+        operations. On a transient error (connection lost, database
+        restarting) the batch goes back to the front of the buffer (up to
+        INTERACTION_BUFFER_LIMIT rows) for the background flusher to retry,
+        so a brief outage is ridden out without sleeping on the caller's
+        thread. On an IntegrityError, rows of users deleted while they were
+        buffered are dropped (along with those users' cached primary keys)
+        and the rest written once more. Any other
+        failure drops the batch, since retrying it could never succeed.
+        
+        Returns:
+            int: Number of interactions written
+        """
+        global _interaction_flush_retry_at
+        
+        with _interaction_buffer_lock:
+            pending = list(_interaction_buffer)
+            _interaction_buffer.clear()
+        
+        if not pending:
+            return 0
+        
+        try:
+            try:
+                AnalyticsService._insert_interactions(pending)
+            except IntegrityError as e:
+                user_ids = set(User.objects.filter(
+                    pk__in={row[0] for row in pending}
+                ).values_list('pk', flat=True))
+                remaining = [row for row in pending if row[0] in user_ids]
+                for telegram_id in {row[3] for row in pending if row[0] not in user_ids}:
+                    if telegram_id is not None:
+                        forget_cached_user_pk(telegram_id)
+                logger.warning(
+                    f"Dropping {len(pending) - len(remaining)} buffered interactions of deleted users: {e}"
+                )
+                pending = remaining
+                AnalyticsService._insert_interactions(pending)
+        except (OperationalError, InterfaceError) as e:
+            logger.error(f"Failed to flush {len(pending)} buffered interactions: {e}", exc_info=True)
+            
+            # Requeue the batch ahead of newer rows, keeping the newest ones
+            # if the buffer would outgrow its limit
+            with _interaction_buffer_lock:
+                room = max(AnalyticsService.INTERACTION_BUFFER_LIMIT - len(_interaction_buffer), 0)
+                requeued = pending[len(pending) - room:] if room < len(pending) else pending
+                _interaction_buffer.extendleft(reversed(requeued))
+                _interaction_flush_retry_at = time.monotonic() + AnalyticsService.INTERACTION_FLUSH_INTERVAL
+            
+            if len(requeued) < len(pending):
+                logger.error(f"Dropped {len(pending) - len(requeued)} buffered interactions, buffer is full")
+            return 0
+        except Exception as e:
+            logger.error(f"Dropped {len(pending)} buffered interactions that can't be written: {e}", exc_info=True)
+            return 0
+        
+        _interaction_flush_retry_at = 0.0
+        
+        # One rollup update per user per day instead of one per interaction
+        daily_counts = Counter(
+            (user_id, timezone.localdate(timestamp))
+            for user_id, _, timestamp, _ in pending
+        )
+        for (user_id, date), count in daily_counts.items():
+            AnalyticsService.record_daily_activity(user_id, date, count)
+        
+        logger.info(f"Flushed {len(pending)} buffered interactions")
+        return len(pending)
+    
+    @staticmethod
+    def _insert_interactions(rows):
+        """Bulk insert buffered (user_id, interaction_type, timestamp, telegram_id) tuples."""
+        UserInteraction.objects.bulk_create(
+            [
+                UserInteraction(user_id=user_id, interaction_type=interaction_type, timestamp=timestamp)
+                for user_id, interaction_type, timestamp, _ in rows
+            ],
+            batch_size=AnalyticsService.INTERACTION_BUFFER_SIZE,
+        )
+    
+    @staticmethod
+    def record_daily_activity(user, date, count=1):
+        """
+        Count interactions in the user's UserInteractionDailyActive row for a day.
+        
+        Failures are logged and swallowed so the raw interaction, which is the
+        source of truth, is never retried or lost because of the rollup.
+        
+        Args:
+            user: User instance or primary key
+            date (date): Day the interactions happened on
+            count (int): Number of interactions to add (default: 1)
+        """
+        user_id = getattr(user, 'pk', user)
+        
+        try:
+            updated = UserInteractionDailyActive.objects.filter(
+                user_id=user_id, date=date
+            ).update(interaction_count=F('interaction_count') + count)
+            
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        UserInteractionDailyActive.objects.create(
+                            user_id=user_id, date=date, interaction_count=count
+                        )
+                except IntegrityError:
+                    # Another worker created the row first
+                    UserInteractionDailyActive.objects.filter(
+                        user_id=user_id, date=date
+                    ).update(interaction_count=F('interaction_count') + count)
+        except Exception as e:
+            logger.warning(f"Failed to update daily activity rollup: {e}")
+    
     @staticmethod
     def clear_cache():
         """
         Clear the MAU cache to force recalculation.
         
-        Handles cache failures gracefully without raising exceptions.
+        Bumps the MAU cache key version (see mau_cache_key); the stale copy is
+        kept as a fallback. Handles cache failures gracefully without raising
+        exceptions.
         """
         try:
-            cache.delete(AnalyticsService.CACHE_KEY_MAU)
+            try:
+                cache.incr(AnalyticsService.CACHE_KEY_MAU_VERSION)
+            except ValueError:
+                # No version yet; start after the default of 0
+                cache.add(AnalyticsService.CACHE_KEY_MAU_VERSION, 1, None)
             logger.info("MAU cache cleared")
         except Exception as e:
             logger.warning(f"Failed to clear MAU cache: {e}")
@@ -269,14 +750,11 @@ class AnalyticsService:
             dict: Analytics report containing:
                 - total_interactions: Total number of interactions recorded
                 - monthly_active_users: Number of unique users in last 30 days
-                - interaction_types_breakdown: Count of each interaction type
+                - interaction_types_breakdown: Count of each interaction type,
+                  from the latest InteractionTypeSnapshot when it is recent
                 - daily_active_users: Number of unique users in last 24 hours
                 - weekly_active_users: Number of unique users in last 7 days
         """
-        from bot.models import UserInteraction
-        from datetime import timedelta
-        from django.db.models import Count
-        
         try:
             now = timezone.now()
             
@@ -288,35 +766,36 @@ class AnalyticsService:
             # Total interactions (all time)
             total_interactions = UserInteraction.objects.count()
             
-            # Monthly active users (already cached)
-            monthly_active_users = AnalyticsService.get_monthly_active_users_count()
-            
-            # Daily active users
-            daily_active_users = UserInteraction.objects.filter(
-                timestamp__gte=one_day_ago
-            ).values('user').distinct().count()
-            
-            # Weekly active users
-            weekly_active_users = UserInteraction.objects.filter(
-                timestamp__gte=seven_days_ago
-            ).values('user').distinct().count()
+            # Daily, weekly and monthly active users in one pass over the
+            # 30-day window (served by the (timestamp, user) index)
+            active_users = UserInteraction.objects.filter(
+                timestamp__gte=thirty_days_ago
+            ).aggregate(
+                daily=Count('user', filter=Q(timestamp__gte=one_day_ago), distinct=True),
+                weekly=Count('user', filter=Q(timestamp__gte=seven_days_ago), distinct=True),
+                monthly=Count('user', distinct=True),
+            )
             
-            # Interaction types breakdown (aggregate counts only, no user info)
-            interaction_types = UserInteraction.objects.values('interaction_type').annotate(
-                count=Count('id')
-            ).order_by('-count')
+            # Interaction types breakdown (aggregate counts only, no user
+            # info); group the whole table only if there is no recent snapshot
+            interaction_types = InteractionTypeSnapshot.objects.filter(
+                computed_at__gte=now - timedelta(seconds=AnalyticsService.INTERACTION_TYPE_SNAPSHOT_MAX_AGE)
+            ).values_list('interaction_type', 'count').order_by('-count')
+            interaction_types_breakdown = dict(interaction_types)
             
-            interaction_types_breakdown = {
-                item['interaction_type']: item['count']
-                for item in interaction_types
-            }
+            if not interaction_types_breakdown:
+                interaction_types_breakdown = dict(
+                    UserInteraction.objects.values_list('interaction_type').annotate(
+                        count=Count('*')
+                    ).order_by('-count')
+                )
             
             # Build the report with only aggregate data
             report = {
                 'total_interactions': total_interactions,
-                'monthly_active_users': monthly_active_users,
-                'daily_active_users': daily_active_users,
-                'weekly_active_users': weekly_active_users,
+                'monthly_active_users': active_users['monthly'],
+                'daily_active_users': active_users['daily'],
+                'weekly_active_users': active_users['weekly'],
                 'interaction_types_breakdown': interaction_types_breakdown,
             }
             
@@ -334,6 +813,44 @@ class AnalyticsService:
                 'interaction_types_breakdown': {},
             }
     
+    @staticmethod
+    def delete_interactions_before(cutoff_date, batch_size=5000):
+        """
+        Delete interactions older than a cutoff in bounded batches.
+        
+        Each batch is a single DELETE ... WHERE id IN (SELECT id ... LIMIT n)
+        run in the database, so no primary keys are loaded into Python and
+        each statement only holds its locks briefly. UserInteraction has no
+        dependent rows or delete signals, so skipping the ORM collector is safe.
+        
+        The UserInteractionDailyActive rollup rows for days before the
+        cutoff are deleted too, so they follow the same retention period.
+        
+        Args:
+            cutoff_date (datetime): Delete interactions with an earlier timestamp
+            batch_size (int): Maximum rows removed per DELETE (default: 5000)
+        
+        Returns:
+            int: Number of interactions deleted
+        """
+        table = connection.ops.quote_name(UserInteraction._meta.db_table)
+        sql = (
+            f'DELETE FROM {table} WHERE "id" IN '
+            f'(SELECT "id" FROM {table} WHERE "timestamp" < %s LIMIT %s)'
+        )
+        
+        deleted_count = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(sql, [cutoff_date, batch_size])
+                if cursor.rowcount <= 0:
+                    break
+                deleted_count += cursor.rowcount
+        
+        # One row per user per day, small enough for a single DELETE
+        UserInteractionDailyActive.objects.filter(date__lt=cutoff_date.date()).delete()
+        return deleted_count
+    
     @staticmethod
     def cleanup_old_interactions(days=90):
         """
@@ -348,16 +865,11 @@ class AnalyticsService:
         Returns:
             int: Number of interactions deleted
         """
-        from bot.models import UserInteraction
-        from datetime import timedelta
-        
         try:
             cutoff_date = timezone.now() - timedelta(days=days)
             
             # Delete interactions older than the retention period
-            deleted_count, _ = UserInteraction.objects.filter(
-                timestamp__lt=cutoff_date
-            ).delete()
+            deleted_count = AnalyticsService.delete_interactions_before(cutoff_date)
             
             # Clear cache after cleanup to ensure fresh calculations
             AnalyticsService.clear_cache()
@@ -393,10 +905,8 @@ class AnalyticsService:
                 - message (str): Status message
                 - count (int): The MAU count that was used
                 - error (str, optional): Error message if failed
+                - rate_limited (bool, optional): True if Telegram rate limited the update
         """
-        import time
-        from django.conf import settings
-        
         # Default configuration
         default_config = {
             'enabled': False,
@@ -422,19 +932,37 @@ class AnalyticsService:
                 'count': 0
             }
         
-        # Check rate limiting using cache
+        # Claim this update interval atomically: cache.add() only succeeds
+        # for one caller, so concurrent workers can't both reach Telegram.
+        # The key expires with the interval, so it needs no other cleanup.
         last_update_key = 'bot_description_last_update'
-        last_update_time = cache.get(last_update_key)
+        update_interval = config['update_interval']
         
-        if last_update_time is not None:
-            time_since_update = time.time() - last_update_time
-            if time_since_update < config['update_interval']:
-                return {
-                    'success': False,
-                    'message': f'Rate limited: {int(config["update_interval"] - time_since_update)}s until next update allowed',
-                    'count': 0
-                }
+        if not cache.add(last_update_key, time.time(), timeout=update_interval):
+            return {
+                'success': False,
+                'message': f'Rate limited: at most one update every {int(update_interval)}s',
+                'count': 0
+            }
+        
+        result = AnalyticsService._set_bot_description(bot_instance, config)
         
+        # Free the interval again so a failed update can be retried right
+        # away, unless Telegram itself asked us to back off
+        if not result['success'] and not result.get('rate_limited'):
+            cache.delete(last_update_key)
+        
+        return result
+    
+    @staticmethod
+    def _set_bot_description(bot_instance, config):
+        """
+        Push the user count into the bot's description, with retries.
+        
+        Called by update_bot_description_with_count once it holds the
+        update interval; takes the same bot_instance and merged config and
+        returns the same result dictionary.
+        """
         # Get the user count based on config
         try:
             count_type = config.get('count_type', 'monthly_active_users')
@@ -462,21 +990,20 @@ class AnalyticsService:
             return {
                 'success': False,
                 'message': 'Invalid description template format',
-                'count': mau_count,
+                'count': user_count,
                 'error': str(e)
             }
         
         # Get or create bot instance
         if bot_instance is None:
             try:
-                from telebot import TeleBot
-                bot_instance = TeleBot(settings.BOT_TOKEN, parse_mode="HTML", threaded=False)
+                bot_instance = AnalyticsService._get_bot_instance()
             except Exception as e:
                 logger.error(f"Error creating bot instance: {e}", exc_info=True)
                 return {
                     'success': False,
                     'message': 'Failed to create bot instance',
-                    'count': mau_count,
+                    'count': user_count,
                     'error': str(e)
                 }
         
@@ -490,9 +1017,6 @@ class AnalyticsService:
                 # Note: set_my_description is the correct method for bot description
                 bot_instance.set_my_description(description)
                 
-                # Update the last update timestamp
-                cache.set(last_update_key, time.time(), timeout=None)
-                
                 logger.info(f"Successfully updated bot description with MAU count: {formatted_count}")
                 return {
                     'success': True,
@@ -511,8 +1035,9 @@ class AnalyticsService:
                     return {
                         'success': False,
                         'message': 'Telegram API rate limit exceeded',
-                        'count': mau_count,
-                        'error': error_msg
+                        'count': user_count,
+                        'error': error_msg,
+                        'rate_limited': True
                     }
                 
                 if 'permission' in error_msg.lower() or '403' in error_msg:
@@ -521,7 +1046,7 @@ class AnalyticsService:
                     return {
                         'success': False,
                         'message': 'Insufficient permissions to update bot description',
-                        'count': mau_count,
+                        'count': user_count,
                         'error': error_msg
                     }
                 
@@ -546,6 +1071,24 @@ class AnalyticsService:
             'count': user_count
         }
     
+    @staticmethod
+    def _get_bot_instance():
+        """
+        Get the process-wide TeleBot used for description updates.
+        
+        Created on first use and then reused, so repeated updates keep the
+        same HTTP session and its keep-alive connections.
+        
+        Returns:
+            TeleBot: The shared bot instance
+        """
+        global _bot_instance
+        
+        with _bot_instance_lock:
+            if _bot_instance is None:
+                _bot_instance = TeleBot(settings.BOT_TOKEN, parse_mode="HTML", threaded=False)
+            return _bot_instance
+    
     @staticmethod
     def get_bot_description_config():
         """
@@ -554,8 +1097,6 @@ class AnalyticsService:
         Returns:
             dict: Configuration dictionary with default values if not set in settings
         """
-        from django.conf import settings
-        
         # Try to get configuration from settings
         return getattr(settings, 'BOT_DESCRIPTION_CONFIG', {
             'enabled': False,
@@ -563,4 +1104,8 @@ class AnalyticsService:
             'update_interval': 3600,
             'retry_attempts': 3,
             'retry_delay': 60,
-        })
\ No newline at end of file
+        })
+
+
+# Drain buffered interactions when the process shuts down
+atexit.register(AnalyticsService.flush_interactions)
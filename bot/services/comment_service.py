@@ -1,9 +1,24 @@
 """
 Comment service for managing comments and reactions.
 """
-from django.db import transaction
-from django.core.paginator import Paginator
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Prefetch, Q
 from bot.models import Comment, Reaction, User, Confession
+from bot.services.confession_service import comments_button_keyboard
+import logging
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Columns a comment listing reads. Comments are shown anonymously, so only
+# the author's id is loaded, not the rest of the User row.
+COMMENT_LIST_FIELDS = (
+    'confession', 'parent_comment', 'text', 'created_at',
+    'like_count', 'dislike_count', 'report_count', 'user__id',
+)
 
 
 def create_comment(user, confession, text, parent_comment=None, bot_instance=None):
@@ -34,52 +49,156 @@ def create_comment(user, confession, text, parent_comment=None, bot_instance=Non
             text=text
         )
         
-        # Increment user's comment count
-        user.total_comments += 1
-        user.save(update_fields=['total_comments'])
-        
-        # Update channel message button with new comment count
-        if bot_instance and confession.channel_message_id:
-            update_channel_button(confession, bot_instance)
+        # Increment user's comment count in the database (no lost updates
+        # from concurrent comments by the same user)
+        User.objects.filter(pk=user.pk).update(total_comments=F('total_comments') + 1)
+    
+    # Update channel message button with new comment count once the comment
+    # is committed, so the transaction isn't held open across the Telegram
+    # request; the post_save signal bumped Confession.comment_count
+    if bot_instance and confession.channel_message_id:
+        confession.refresh_from_db(fields=['comment_count'])
+        update_channel_button(confession, bot_instance)
     
     return comment
 
 
-def get_comments(confession, page=1, page_size=10):
+def _encode_cursor(direction, comment):
+    """Encode a page boundary as 'n' (next) or 'p' (previous) + microseconds.id"""
+    micros = (comment.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{direction}{micros}.{comment.id}"
+
+
+def _decode_cursor(cursor):
+    """
+    Decode a cursor built by _encode_cursor.
+    
+    Returns:
+        tuple: (direction, created_at, id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    direction, rest = cursor[:1], cursor[1:]
+    micros, _, comment_id = rest.partition('.')
+    if direction not in ('n', 'p') or not micros.isdigit() or not comment_id.isdigit():
+        raise ValueError(f"Invalid comments cursor: {cursor}")
+    return direction, EPOCH + timedelta(microseconds=int(micros)), int(comment_id)
+
+
+def get_comments(confession, page=1, page_size=10, with_replies=False, cursor=None):
     """
     Get paginated comments for a confession.
     
+    Pages are read with keyset pagination on (created_at, id), newest first,
+    so no COUNT query is needed. Follow next_cursor/previous_cursor to move
+    between pages; without a cursor the given page number is read instead.
+    
     Args:
         confession: Confession instance
         page: Page number (default: 1)
         page_size: Number of comments per page (default: 10)
+        with_replies: Also prefetch each comment's replies (with their users),
+            oldest first (default: False)
+        cursor: Optional next_cursor/previous_cursor from an earlier page
     
     Returns:
         dict: Dictionary containing:
-            - comments: List of Comment instances
+            - comments: List of Comment instances, each with a reply_count
             - has_next: Boolean indicating if there are more pages
             - has_previous: Boolean indicating if there are previous pages
-            - total_pages: Total number of pages
+            - next_cursor: Cursor for the next page (None if there is none)
+            - previous_cursor: Cursor for the previous page (None if there is none)
             - current_page: Current page number
+            - comment_count: Comments and replies on the confession
+    
+    Raises:
+        ValueError: If cursor is malformed
     """
-    # Get top-level comments (no parent) for this confession
+    # Get top-level comments (no parent) for this confession, counting
+    # replies in the same query instead of loading them
     comments_queryset = Comment.objects.filter(
         confession=confession,
         parent_comment=None
-    ).select_related('user').prefetch_related('replies').order_by('-created_at')
+    ).select_related('user').only(*COMMENT_LIST_FIELDS).annotate(
+        reply_count=Count('replies')
+    )
     
-    paginator = Paginator(comments_queryset, page_size)
-    page_obj = paginator.get_page(page)
+    if with_replies:
+        comments_queryset = comments_queryset.prefetch_related(Prefetch(
+            'replies',
+            queryset=Comment.objects.select_related('user').only(*COMMENT_LIST_FIELDS).order_by('created_at'),
+        ))
+    
+    # Fetch one extra row to tell whether another page follows
+    if cursor:
+        direction, created_at, comment_id = _decode_cursor(cursor)
+        if direction == 'n':
+            comments = list(comments_queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=comment_id)
+            ).order_by('-created_at', '-id')[:page_size + 1])
+            has_next = len(comments) > page_size
+            has_previous = True
+            comments = comments[:page_size]
+        else:
+            # Walk backwards from the cursor, then restore newest-first order
+            comments = list(comments_queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=comment_id)
+            ).order_by('created_at', 'id')[:page_size + 1])
+            has_previous = len(comments) > page_size
+            has_next = True
+            comments = comments[:page_size][::-1]
+    else:
+        page = max(int(page), 1)
+        offset = (page - 1) * page_size
+        comments = list(comments_queryset.order_by('-created_at', '-id')[offset:offset + page_size + 1])
+        has_next = len(comments) > page_size
+        has_previous = page > 1
+        comments = comments[:page_size]
+    
+    # Every row belongs to this confession; attach it so rendering
+    # (e.g. the #venter check) doesn't fetch it once per comment and reply
+    for comment in comments:
+        comment.confession = confession
+        if with_replies:
+            for reply in comment.replies.all():
+                reply.confession = confession
     
     return {
-        'comments': list(page_obj.object_list),
-        'has_next': page_obj.has_next(),
-        'has_previous': page_obj.has_previous(),
-        'total_pages': paginator.num_pages,
-        'current_page': page_obj.number,
+        'comments': comments,
+        'has_next': has_next,
+        'has_previous': has_previous,
+        'next_cursor': _encode_cursor('n', comments[-1]) if has_next and comments else None,
+        'previous_cursor': _encode_cursor('p', comments[0]) if has_previous and comments else None,
+        'current_page': page,
+        'comment_count': confession.comment_count,
     }
 
 
+def _insert_reaction(comment, user, reaction_type):
+    """
+    Insert a reaction, or return the existing one if it is already there.
+    
+    Tries the INSERT first and lets the (comment, user, reaction_type)
+    unique constraint reject duplicates, so a new reaction costs a single
+    statement instead of get_or_create()'s SELECT followed by an INSERT.
+    """
+    try:
+        with transaction.atomic():
+            return Reaction.objects.create(
+                comment=comment,
+                user=user,
+                reaction_type=reaction_type
+            )
+    except IntegrityError:
+        # Already reacted (or a concurrent tap got there first)
+        return Reaction.objects.get(
+            comment=comment,
+            user=user,
+            reaction_type=reaction_type
+        )
+
+
 def add_reaction(user, comment, reaction_type):
     """
     Add or update a reaction to a comment.
@@ -94,7 +213,8 @@ def add_reaction(user, comment, reaction_type):
         reaction_type: String ('like', 'dislike', or 'report')
     
     Returns:
-        Reaction: The created or updated reaction
+        Reaction: The created or updated reaction. The comment's like, dislike
+        and report counts are updated in place with the stored values.
     
     Raises:
         ValueError: If reaction_type is invalid
@@ -103,72 +223,42 @@ def add_reaction(user, comment, reaction_type):
     if reaction_type not in valid_reactions:
         raise ValueError(f"Invalid reaction type: {reaction_type}. Must be one of {valid_reactions}")
     
-    with transaction.atomic():
-        if reaction_type in ['like', 'dislike']:
-            # Like/Dislike logic: mutually exclusive
-            # Check if user already has this exact reaction
-            existing_same = Reaction.objects.filter(
-                comment=comment, 
-                user=user, 
-                reaction_type=reaction_type
-            ).first()
-            
-            if existing_same:
-                # Already has this reaction, do nothing
-                return existing_same
-            
-            # Check for opposite reaction (like vs dislike)
-            opposite_type = 'dislike' if reaction_type == 'like' else 'like'
-            existing_opposite = Reaction.objects.filter(
+    # The Reaction signals move the counters with an F() UPDATE inside the
+    # same transaction as the reaction write
+    if reaction_type in ['like', 'dislike']:
+        # Like/Dislike logic: mutually exclusive. Lock the user's current
+        # like/dislike (if any) in one query, then branch in Python
+        with transaction.atomic():
+            reaction = Reaction.objects.select_for_update().filter(
                 comment=comment,
                 user=user,
-                reaction_type=opposite_type
+                reaction_type__in=['like', 'dislike']
             ).first()
             
-            if existing_opposite:
-                # Remove opposite reaction
-                if opposite_type == 'like':
-                    comment.like_count = max(0, comment.like_count - 1)
-                else:
-                    comment.dislike_count = max(0, comment.dislike_count - 1)
-                existing_opposite.delete()
-            
-            # Create new reaction
-            reaction = Reaction.objects.create(
-                comment=comment,
-                user=user,
-                reaction_type=reaction_type
-            )
+            if reaction and reaction.reaction_type == reaction_type:
+                # Already has this reaction, nothing to write
+                return reaction
             
-            # Increment count
-            if reaction_type == 'like':
-                comment.like_count += 1
+            if reaction:
+                # Switch the opposite reaction in place with one UPDATE
+                reaction.reaction_type = reaction_type
+                reaction.save(update_fields=['reaction_type'])
             else:
-                comment.dislike_count += 1
-                
-        elif reaction_type == 'report':
-            # Report logic: independent of like/dislike
-            # Check if already reported
-            existing_report = Reaction.objects.filter(
-                comment=comment,
-                user=user,
-                reaction_type='report'
-            ).first()
-            
-            if existing_report:
-                # Already reported, do nothing
-                return existing_report
-            
-            # Create new report reaction (doesn't affect like/dislike)
-            reaction = Reaction.objects.create(
-                comment=comment,
-                user=user,
-                reaction_type='report'
-            )
-            
-            comment.report_count += 1
+                reaction = _insert_reaction(comment, user, reaction_type)
         
-        comment.save(update_fields=['like_count', 'dislike_count', 'report_count'])
+    elif reaction_type == 'report':
+        # Report logic: independent of like/dislike; reporting twice
+        # keeps the existing report
+        reaction = _insert_reaction(comment, user, 'report')
+    
+    # The Reaction signals updated the counters in the database; hand
+    # the stored counts back on the caller's instance so it doesn't
+    # need a full refresh_from_db()
+    counts = Comment.objects.filter(pk=comment.pk).values(
+        'like_count', 'dislike_count', 'report_count'
+    ).get()
+    for field, value in counts.items():
+        setattr(comment, field, value)
     
     return reaction
 
@@ -205,9 +295,6 @@ def update_channel_button(confession, bot_instance):
     Returns:
         bool: True if updated successfully, False otherwise
     """
-    from django.conf import settings
-    from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-    
     if not confession.channel_message_id:
         return False
     
@@ -216,19 +303,9 @@ def update_channel_button(confession, bot_instance):
         return False
     
     try:
-        # Get bot username from settings
-        bot_username = getattr(settings, 'BOT_USERNAME', 'your_bot')
-        
-        # Get current comment count
-        comment_count = confession.comments.count()
-        
-        # Create updated keyboard
-        keyboard = InlineKeyboardMarkup()
-        button_text = f"💬 View / Add Comments ({comment_count})"
-        keyboard.add(InlineKeyboardButton(
-            button_text,
-            url=f"https://t.me/{bot_username}?start=comments_{confession.id}"
-        ))
+        # Keyboard with the denormalized comment count (kept current by the
+        # Comment signals)
+        keyboard = comments_button_keyboard(confession)
         
         # Update the message's reply markup (button only)
         bot_instance.edit_message_reply_markup(
@@ -240,5 +317,5 @@ def update_channel_button(confession, bot_instance):
         return True
     except Exception as e:
         # Log error but don't fail the comment creation
-        print(f"Error updating channel button: {e}")
+        logger.warning(f"Error updating channel button: {e}")
         return False
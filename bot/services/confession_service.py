@@ -1,10 +1,31 @@
 """
 Confession service for managing confession lifecycle.
 """
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.conf import settings
-from bot.models import Confession, User
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from bot.models import Comment, Confession, Reaction, User
+from bot.services.notification_service import clear_user_blocked, confession_author
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns the moderation queue (/pending) reads, including only the
+# author's name fields rather than the whole User row
+PENDING_LIST_FIELDS = (
+    'user', 'text', 'is_anonymous', 'status', 'reviewed_by', 'created_at',
+    'user__first_name', 'user__username', 'user__telegram_id',
+)
+
+CHANNEL_POST_TEMPLATE = """
+📝 <b>Confession {id}</b>
+
+{text}
+
+<i>— {author}</i>
+"""
 
 
 def create_confession(user, text, is_anonymous=None):
@@ -36,6 +57,10 @@ def create_confession(user, text, is_anonymous=None):
         status='pending'
     )
     
+    # Submitting means the user can be messaged again; without this a flag
+    # from before they unblocked the bot would swallow the review notice
+    clear_user_blocked(user.telegram_id)
+    
     return confession
 
 
@@ -51,21 +76,23 @@ def approve_confession(confession, admin, bot_instance=None):
     Returns:
         Confession: The approved confession
     """
+    # Publish before opening the transaction so it is not held open across
+    # the Telegram request; if publishing fails nothing has been written and
+    # the confession stays pending for another try
+    update_fields = ['status', 'reviewed_by', 'reviewed_at']
+    if bot_instance:
+        confession.channel_message_id = publish_to_channel(confession, bot_instance)
+        update_fields.append('channel_message_id')
+    
     with transaction.atomic():
         confession.status = 'approved'
         confession.reviewed_by = admin
         confession.reviewed_at = timezone.now()
-        confession.save(update_fields=['status', 'reviewed_by', 'reviewed_at'])
+        confession.save(update_fields=update_fields)
         
-        # Increment user's confession count
-        confession.user.total_confessions += 1
-        confession.user.save(update_fields=['total_confessions'])
-        
-        # Publish to channel if bot instance provided
-        if bot_instance:
-            channel_message_id = publish_to_channel(confession, bot_instance)
-            confession.channel_message_id = channel_message_id
-            confession.save(update_fields=['channel_message_id'])
+        # Increment user's confession count in the database (no lost updates
+        # from concurrent approvals for the same user)
+        User.objects.filter(pk=confession.user_id).update(total_confessions=F('total_confessions') + 1)
     
     return confession
 
@@ -108,10 +135,24 @@ def delete_confession(confession, bot_instance=None):
                 bot_instance.delete_message(channel_id, confession.channel_message_id)
         except Exception as e:
             # Log error but continue with database deletion
-            print(f"Error deleting message from channel: {e}")
-    
-    # Delete from database
-    confession.delete()
+            logger.warning(f"Error deleting message from channel: {e}")
+    
+    # Delete from database. The cascade collector would load every comment
+    # and reaction to send their post_delete signals, which only adjust
+    # Comment.*_count and Confession.comment_count on rows deleted here as
+    # well. Remove the subtree with one plain DELETE per table instead,
+    # children first, and let the ORM delete the (now childless) confession.
+    reaction_table = connection.ops.quote_name(Reaction._meta.db_table)
+    comment_table = connection.ops.quote_name(Comment._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {reaction_table} WHERE "comment_id" IN '
+                f'(SELECT "id" FROM {comment_table} WHERE "confession_id" = %s)',
+                [confession.pk],
+            )
+            cursor.execute(f'DELETE FROM {comment_table} WHERE "confession_id" = %s', [confession.pk])
+        confession.delete()
     return True
 
 
@@ -122,7 +163,27 @@ def get_pending_confessions():
     Returns:
         QuerySet: Confessions with status 'pending'
     """
-    return Confession.objects.filter(status='pending').select_related('user').order_by('created_at')
+    # Pending confessions have no reviewer yet, so only the author is joined
+    return Confession.objects.filter(status='pending').select_related('user').only(
+        *PENDING_LIST_FIELDS
+    ).order_by('created_at')
+
+
+def comments_button_keyboard(confession):
+    """
+    Build the "View / Add Comments" button shown under a channel post.
+    
+    It is a URL button that opens the bot in a private chat with a deep
+    link, and shows the confession's (denormalized) comment count.
+    """
+    bot_username = getattr(settings, 'BOT_USERNAME', 'your_bot')
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton(
+        f"💬 View / Add Comments ({confession.comment_count})",
+        url=f"https://t.me/{bot_username}?start=comments_{confession.id}"
+    ))
+    return keyboard
 
 
 def publish_to_channel(confession, bot_instance):
@@ -144,36 +205,13 @@ def publish_to_channel(confession, bot_instance):
         raise ValueError("CHANNEL_ID not configured in settings")
     
     # Format the message
-    author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-    if not confession.is_anonymous and confession.user.username:
-        author += f" (@{confession.user.username})"
-    
-    message_text = f"""
-📝 <b>Confession {confession.id}</b>
-
-{confession.text}
-
-<i>— {author}</i>
-"""
-    
-    # Create inline keyboard with "View / Add Comments" button
-    # Use URL button to open bot in private chat with deep link
-    from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-    
-    # Get bot username from settings
-    bot_username = getattr(settings, 'BOT_USERNAME', 'your_bot')
-    
-    # Get comment count for this confession
-    comment_count = confession.comments.count()
+    message_text = CHANNEL_POST_TEMPLATE.format_map({
+        'id': confession.id,
+        'text': confession.text,
+        'author': confession_author(confession),
+    })
     
-    keyboard = InlineKeyboardMarkup()
-    # URL button that opens bot in private chat with start parameter
-    # Include comment count in button text
-    button_text = f"💬 View / Add Comments ({comment_count})"
-    keyboard.add(InlineKeyboardButton(
-        button_text, 
-        url=f"https://t.me/{bot_username}?start=comments_{confession.id}"
-    ))
+    keyboard = comments_button_keyboard(confession)
     
     # Send to channel
     sent_message = bot_instance.send_message(
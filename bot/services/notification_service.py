@@ -1,8 +1,69 @@
 """
 Notification service for admin and user notifications.
 """
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
-from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent Telegram requests when messaging every admin
+MAX_ADMIN_NOTIFY_WORKERS = 8
+
+# Users whose chat refused a message (blocked the bot / deactivated) are
+# remembered for a day, so status notifications skip the doomed request
+BLOCKED_USER_CACHE_PREFIX = 'tg_blocked:'
+BLOCKED_USER_CACHE_TIMEOUT = 86400  # 1 day
+
+# Characters of confession text shown in admin messages
+PREVIEW_LENGTH = 200
+
+ADMIN_NOTIFICATION_TEMPLATE = """
+🔔 <b>New Confession Pending Review</b>
+
+<b>Confession ID {id}</b>
+<b>From:</b> {author}
+<b>Submitted:</b> {submitted}
+
+<b>Preview:</b>
+{preview}
+"""
+
+
+def confession_author(confession):
+    """Return how a confession's author is shown to admins."""
+    if confession.is_anonymous:
+        return "Anonymous"
+    
+    author = f"{confession.user.first_name}"
+    if confession.user.username:
+        author += f" (@{confession.user.username})"
+    return author
+
+
+def confession_preview(text):
+    """Truncate confession text to PREVIEW_LENGTH characters for admin messages."""
+    if len(text) > PREVIEW_LENGTH:
+        return text[:PREVIEW_LENGTH] + "..."
+    return text
+
+
+def admin_review_keyboard(confession_id):
+    """
+    Build the Approve / Reject keyboard for a pending confession.
+    
+    The callback data format here is what the approve_/reject_ callback
+    handlers parse.
+    """
+    from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.row(
+        InlineKeyboardButton("✅ Approve", callback_data=f"approve_{confession_id}"),
+        InlineKeyboardButton("❌ Reject", callback_data=f"reject_{confession_id}")
+    )
+    return keyboard
 
 
 def notify_admins_new_confession(confession, bot_instance):
@@ -21,36 +82,17 @@ def notify_admins_new_confession(confession, bot_instance):
         return []
     
     # Format the notification message
-    author = "Anonymous" if confession.is_anonymous else f"{confession.user.first_name}"
-    if not confession.is_anonymous and confession.user.username:
-        author += f" (@{confession.user.username})"
+    message_text = ADMIN_NOTIFICATION_TEMPLATE.format_map({
+        'id': confession.id,
+        'author': confession_author(confession),
+        'submitted': confession.created_at.strftime('%Y-%m-%d %H:%M UTC'),
+        'preview': confession_preview(confession.text),
+    })
     
-    # Truncate text for preview if too long
-    preview_text = confession.text
-    if len(preview_text) > 200:
-        preview_text = preview_text[:200] + "..."
-    
-    message_text = f"""
-🔔 <b>New Confession Pending Review</b>
-
-<b>Confession ID {confession.id}</b>
-<b>From:</b> {author}
-<b>Submitted:</b> {confession.created_at.strftime('%Y-%m-%d %H:%M UTC')}
-
-<b>Preview:</b>
-{preview_text}
-"""
-    
-    # Create inline keyboard with approve/reject buttons
-    keyboard = InlineKeyboardMarkup()
-    keyboard.row(
-        InlineKeyboardButton("✅ Approve", callback_data=f"approve_{confession.id}"),
-        InlineKeyboardButton("❌ Reject", callback_data=f"reject_{confession.id}")
-    )
+    # Inline keyboard with approve/reject buttons, shared by every send
+    keyboard = admin_review_keyboard(confession.id)
     
-    # Send to all admins
-    sent_message_ids = []
-    for admin_id in admins:
+    def send_to_admin(admin_id):
         try:
             sent_message = bot_instance.send_message(
                 admin_id,
@@ -58,14 +100,35 @@ def notify_admins_new_confession(confession, bot_instance):
                 parse_mode='HTML',
                 reply_markup=keyboard
             )
-            sent_message_ids.append(sent_message.message_id)
+            return sent_message.message_id
         except Exception as e:
             # Log error but continue notifying other admins
-            print(f"Error notifying admin {admin_id}: {e}")
+            logger.warning(f"Error notifying admin {admin_id}: {e}")
+            return None
+    
+    # Send to all admins at once; each send is a separate HTTPS round-trip,
+    # so doing them in parallel takes about as long as the slowest one
+    with ThreadPoolExecutor(max_workers=min(len(admins), MAX_ADMIN_NOTIFY_WORKERS)) as executor:
+        results = list(executor.map(send_to_admin, admins))
+    
+    sent_message_ids = [message_id for message_id in results if message_id is not None]
     
     return sent_message_ids
 
 
+def clear_user_blocked(user_telegram_id):
+    """
+    Forget that a user's chat refused a message.
+    
+    Called when the user talks to the bot again, which means they have
+    unblocked it, so their next status notification is sent.
+    """
+    try:
+        cache.delete(f"{BLOCKED_USER_CACHE_PREFIX}{user_telegram_id}")
+    except Exception as e:
+        logger.warning(f"Failed to clear blocked flag for user {user_telegram_id}: {e}")
+
+
 def notify_user_confession_status(confession, status, bot_instance):
     """
     Notify user about their confession status (approved or rejected).
@@ -100,6 +163,13 @@ If you have questions, please contact an administrator.
         # Unknown status
         return None
     
+    blocked_key = f"{BLOCKED_USER_CACHE_PREFIX}{user_telegram_id}"
+    try:
+        if cache.get(blocked_key):
+            return None
+    except Exception as e:
+        logger.warning(f"Failed to read blocked flag for user {user_telegram_id}: {e}")
+    
     try:
         sent_message = bot_instance.send_message(
             user_telegram_id,
@@ -109,5 +179,12 @@ If you have questions, please contact an administrator.
         return sent_message.message_id
     except Exception as e:
         # Log error
-        print(f"Error notifying user {user_telegram_id}: {e}")
+        logger.warning(f"Error notifying user {user_telegram_id}: {e}")
+        
+        # 403 Forbidden: the user blocked the bot, don't try again for a while
+        if getattr(e, 'error_code', None) == 403 or 'forbidden' in str(e).lower():
+            try:
+                cache.set(blocked_key, True, BLOCKED_USER_CACHE_TIMEOUT)
+            except Exception as cache_error:
+                logger.warning(f"Failed to cache blocked flag for user {user_telegram_id}: {cache_error}")
         return None
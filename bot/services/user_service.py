@@ -1,9 +1,53 @@
 """
 User service for managing user registration, settings, and statistics.
 """
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Sum, Q, Count
-from bot.models import User, Reaction
+from django.db.models import Sum, Q, Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from bot.models import User, Confession, Comment, Reaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Telegram ID -> User primary key, so per-update paths that only need the
+# key (interaction tracking) skip the users table. Telegram IDs never
+# change. Entries are only written once the row is committed; deleted users
+# are dropped by the post_delete receiver below, and interaction writes that
+# hit a missing user drop the entry too (forget_cached_user_pk).
+USER_PK_CACHE_PREFIX = 'tg:'
+USER_PK_CACHE_TIMEOUT = 86400  # 1 day
+
+
+def _user_pk_cache_key(telegram_id):
+    return f"{USER_PK_CACHE_PREFIX}{telegram_id}"
+
+
+def _remember_user_pk(telegram_id, user_pk):
+    # A rolled-back transaction must not leave a key that no row backs
+    transaction.on_commit(lambda: _store_user_pk(telegram_id, user_pk))
+
+
+def _store_user_pk(telegram_id, user_pk):
+    try:
+        cache.set(_user_pk_cache_key(telegram_id), user_pk, USER_PK_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to cache user id for {telegram_id}: {e}")
+
+
+def forget_cached_user_pk(telegram_id):
+    """
+    Drop the cached primary key for a Telegram ID.
+    
+    Used when the user row is gone without the ORM noticing (a delete that
+    bypassed it, or a rolled-back insert), so writes stop using the stale id.
+    """
+    try:
+        cache.delete(_user_pk_cache_key(telegram_id))
+    except Exception as e:
+        logger.warning(f"Failed to drop cached user id for {telegram_id}: {e}")
 
 
 def register_user(telegram_id, first_name, username=None):
@@ -29,9 +73,44 @@ def register_user(telegram_id, first_name, username=None):
             'impact_points': 0,
         }
     )
+    _remember_user_pk(telegram_id, user.pk)
     return user
 
 
+def get_user_pk(telegram_id):
+    """
+    Look up a registered user's primary key by Telegram ID.
+    
+    Served from the cache when possible; misses read only the id column.
+    Unregistered IDs are not cached, so they are found as soon as the user
+    registers.
+    
+    Args:
+        telegram_id: Telegram user ID
+    
+    Returns:
+        int: The user's primary key, or None if they are not registered
+    """
+    try:
+        user_pk = cache.get(_user_pk_cache_key(telegram_id))
+    except Exception as e:
+        logger.warning(f"Failed to read cached user id for {telegram_id}: {e}")
+        user_pk = None
+    
+    if user_pk is None:
+        user_pk = User.objects.filter(telegram_id=telegram_id).values_list('pk', flat=True).first()
+        if user_pk is not None:
+            _remember_user_pk(telegram_id, user_pk)
+    
+    return user_pk
+
+
+@receiver(post_delete, sender=User)
+def forget_user_pk(sender, instance, **kwargs):
+    """Drop a deleted user's cached primary key."""
+    forget_cached_user_pk(instance.telegram_id)
+
+
 def toggle_anonymity(user, enabled):
     """
     Toggle anonymity mode for a user.
@@ -58,17 +137,76 @@ def get_user_stats(user):
     Returns:
         dict: Dictionary containing user statistics
     """
-    impact_points = calculate_impact_points(user)
-    acceptance_score = calculate_acceptance_score(user)
+    # Impact points and acceptance score come from the same counting query
+    counts = _count_user_activity(user)
+    impact = _store_impact_points(user, counts)
     
     return {
-        'total_confessions': user.confessions.filter(status='approved').count(),
-        'total_comments': user.comments.count(),
+        'total_confessions': impact['approved_confessions'],
+        'total_comments': impact['total_comments'],
+        'impact_points': impact['impact_points'],
+        'acceptance_score': _acceptance_score(
+            counts['positive_reactions'], counts['total_reactions']
+        ),
+    }
+
+
+def _count_user_activity(user):
+    """
+    Count what a user's impact points and acceptance score are made of.
+    
+    All counts come back in one round-trip as scalar subqueries (joining
+    the tables instead would multiply confessions by comments per user).
+    
+    Returns:
+        dict: approved_confessions, comment_total, positive_reactions and
+        total_reactions (comment_total avoids clashing with the
+        User.total_comments field)
+    """
+    def count_of(queryset, user_field):
+        counts = queryset.filter(**{user_field: OuterRef('pk')}).order_by().values(
+            user_field
+        ).annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    
+    return User.objects.filter(pk=user.pk).annotate(
+        approved_confessions=count_of(Confession.objects.filter(status='approved'), 'user'),
+        comment_total=count_of(Comment.objects.all(), 'user'),
+        positive_reactions=count_of(Reaction.objects.filter(reaction_type='like'), 'comment__user'),
+        total_reactions=count_of(Reaction.objects.all(), 'comment__user'),
+    ).values(
+        'approved_confessions', 'comment_total', 'positive_reactions', 'total_reactions'
+    ).get()
+
+
+def _store_impact_points(user, counts):
+    """Total the impact points from _count_user_activity counts and save them."""
+    impact_points = (
+        counts['approved_confessions'] + counts['comment_total'] + counts['positive_reactions']
+    )
+    
+    # Update the cached value without a full model save
+    user.impact_points = impact_points
+    User.objects.filter(pk=user.pk).update(impact_points=impact_points)
+    
+    return {
+        'approved_confessions': counts['approved_confessions'],
+        'total_comments': counts['comment_total'],
+        'positive_reactions': counts['positive_reactions'],
         'impact_points': impact_points,
-        'acceptance_score': acceptance_score,
     }
 
 
+def _acceptance_score(positive_reactions, total_reactions):
+    """Percentage of positive reactions, rounded to 2 places (0 if none)."""
+    if not total_reactions:
+        return 0.0
+    
+    acceptance_score = (positive_reactions / total_reactions) * 100
+    
+    return round(acceptance_score, 2)
+
+
 def calculate_impact_points(user):
     """
     Calculate impact points for a user.
@@ -78,24 +216,13 @@ def calculate_impact_points(user):
         user: User instance
     
     Returns:
-        int: Total impact points
+        dict: The counts the points are made of and their total:
+            - approved_confessions: Approved confessions by the user
+            - total_comments: Comments by the user
+            - positive_reactions: Likes received on the user's comments
+            - impact_points: Sum of the three
     """
-    approved_confessions = user.confessions.filter(status='approved').count()
-    total_comments = user.comments.count()
-    
-    # Get positive reactions (likes) on user's comments
-    positive_reactions = Reaction.objects.filter(
-        comment__user=user,
-        reaction_type='like'
-    ).count()
-    
-    impact_points = approved_confessions + total_comments + positive_reactions
-    
-    # Update the cached value
-    user.impact_points = impact_points
-    user.save(update_fields=['impact_points'])
-    
-    return impact_points
+    return _store_impact_points(user, _count_user_activity(user))
 
 
 def calculate_acceptance_score(user):
@@ -109,15 +236,10 @@ def calculate_acceptance_score(user):
     Returns:
         float: Acceptance score as percentage (0-100), or 0 if no reactions
     """
-    # Get all reactions on user's comments
-    reactions = Reaction.objects.filter(comment__user=user)
-    
-    total_reactions = reactions.count()
-    if total_reactions == 0:
-        return 0.0
-    
-    positive_reactions = reactions.filter(reaction_type='like').count()
-    
-    acceptance_score = (positive_reactions / total_reactions) * 100
+    # Total and positive reactions on user's comments in one scan
+    reactions = Reaction.objects.filter(comment__user=user).aggregate(
+        total=Count('id'),
+        positive=Count('id', filter=Q(reaction_type='like')),
+    )
     
-    return round(acceptance_score, 2)
+    return _acceptance_score(reactions['positive'], reactions['total'])
@@ -0,0 +1,158 @@
+"""
+Periodic analytics jobs.
+
+These run outside the request path, from a scheduler such as cron:
+    python manage.py update_mau_count --refresh-snapshot
+
+Results are stored in the database rather than the cache: the default
+cache is per process, so a value written by the cron run would be gone
+before any bot or serverless process could read it.
+"""
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+from bot.models import AnalyticsSnapshot, InteractionTypeSnapshot, UserInteraction, UserInteractionDailyActive
+import logging
+
+logger = logging.getLogger(__name__)
+
+# get_analytics_snapshot ignores snapshots older than this (daily refresh)
+ANALYTICS_SNAPSHOT_MAX_AGE = 25 * 3600  # seconds
+ANALYTICS_SNAPSHOT_FIELDS = (
+    'dau', 'wau', 'mau', 'total_30d', 'total_all', 'users_all',
+    'oldest', 'newest', 'interaction_types', 'generated_at',
+)
+
+
+def collect_analytics_snapshot(now=None):
+    """
+    Query the detailed analytics statistics.
+    
+    Args:
+        now (datetime, optional): Reference time for the today/7d/30d windows
+    
+    Returns:
+        dict: DAU (today)/WAU/MAU, interaction totals, oldest/newest timestamps, the
+        30-day interaction type breakdown and when it was generated
+    """
+    now = now or timezone.now()
+    
+    # Calculate time boundaries
+    seven_days_ago = now - timedelta(days=7)
+    thirty_days_ago = now - timedelta(days=30)
+    
+    # DAU/WAU/MAU from one scan of the per-day rollup table, bucketing
+    # the 30-day window with FILTER clauses
+    active = UserInteractionDailyActive.objects.filter(
+        date__gte=thirty_days_ago.date()
+    ).aggregate(
+        dau=Count('user', filter=Q(date=now.date()), distinct=True),
+        wau=Count('user', filter=Q(date__gte=seven_days_ago.date()), distinct=True),
+        mau=Count('user', distinct=True),
+    )
+    
+    # Remaining scalar metrics in a single aggregate query
+    stats = UserInteraction.objects.aggregate(
+        total_30d=Count('id', filter=Q(timestamp__gte=thirty_days_ago)),
+        total_all=Count('*'),
+        users_all=Count('user', distinct=True),
+        oldest=Min('timestamp'),
+        newest=Max('timestamp'),
+    )
+    
+    # Interaction types breakdown as plain (type, count) tuples.
+    # Count('*') compiles to COUNT(*); Count('pk') would stay COUNT("id").
+    interaction_types_query = UserInteraction.objects.filter(
+        timestamp__gte=thirty_days_ago
+    ).values_list('interaction_type').annotate(
+        count=Count('*')
+    ).order_by('-count')
+    
+    # Surface planner regressions in the most expensive query when debugging
+    if connection.vendor == 'postgresql' and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Interaction types plan:\n{interaction_types_query.explain(analyze=True)}")
+    
+    interaction_types = list(interaction_types_query)
+    
+    return {
+        **active,
+        **stats,
+        'interaction_types': interaction_types,
+        'generated_at': now,
+    }
+
+
+def compute_analytics_snapshot():
+    """
+    Recalculate the analytics snapshot and store it in AnalyticsSnapshot.
+    
+    Only the latest snapshot is kept. Write failures are logged, not raised.
+    
+    Returns:
+        dict: The snapshot (see collect_analytics_snapshot)
+    """
+    snapshot = collect_analytics_snapshot()
+    
+    try:
+        with transaction.atomic():
+            AnalyticsSnapshot.objects.all().delete()
+            AnalyticsSnapshot.objects.create(**snapshot)
+    except Exception as e:
+        logger.warning(f"Failed to store analytics snapshot: {e}")
+    
+    logger.info("Analytics snapshot computed")
+    return snapshot
+
+
+def refresh_interaction_type_snapshot():
+    """
+    Recount all-time interactions per type into InteractionTypeSnapshot.
+    
+    Upserts one row per type and removes types that no longer occur, in a
+    single transaction so readers never see a half-written snapshot.
+    
+    Returns:
+        int: Number of interaction types in the snapshot
+    """
+    now = timezone.now()
+    counts = UserInteraction.objects.values_list('interaction_type').annotate(
+        count=Count('*')
+    ).order_by()
+    
+    with transaction.atomic():
+        InteractionTypeSnapshot.objects.bulk_create(
+            [
+                InteractionTypeSnapshot(interaction_type=interaction_type, count=count, computed_at=now)
+                for interaction_type, count in counts
+            ],
+            update_conflicts=True,
+            unique_fields=['interaction_type'],
+            update_fields=['count', 'computed_at'],
+        )
+        InteractionTypeSnapshot.objects.filter(computed_at__lt=now).delete()
+    
+    snapshot_size = InteractionTypeSnapshot.objects.count()
+    logger.info(f"Interaction type snapshot refreshed: {snapshot_size} types")
+    return snapshot_size
+
+
+def get_analytics_snapshot():
+    """
+    Get the stored analytics snapshot.
+    
+    Returns:
+        dict: The snapshot, or None if there is no recent one or the read failed
+    """
+    try:
+        snapshot = AnalyticsSnapshot.objects.filter(
+            generated_at__gte=timezone.now() - timedelta(seconds=ANALYTICS_SNAPSHOT_MAX_AGE)
+        ).values(*ANALYTICS_SNAPSHOT_FIELDS).order_by('-generated_at').first()
+    except Exception as e:
+        logger.warning(f"Failed to read analytics snapshot: {e}")
+        return None
+    
+    if snapshot is not None:
+        # JSON has no tuples
+        snapshot['interaction_types'] = [tuple(item) for item in snapshot['interaction_types']]
+    return snapshot
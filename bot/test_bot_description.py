@@ -94,6 +94,33 @@ class BotDescriptionUpdateTests(TestCase):
         self.assertFalse(result2['success'])
         self.assertIn('rate limited', result2['message'].lower())
     
+    def test_failed_update_can_be_retried(self):
+        """Test that a failed update does not hold the rate limit"""
+        mock_bot = Mock()
+        mock_bot.set_my_description = Mock(side_effect=[Exception("API Error"), None])
+        
+        config = {
+            'enabled': True,
+            'description_template': 'Test Bot - {count} users',
+            'update_interval': 3600,
+            'retry_attempts': 1,
+            'retry_delay': 0
+        }
+        
+        result1 = AnalyticsService.update_bot_description_with_count(
+            bot_instance=mock_bot,
+            config=config
+        )
+        self.assertFalse(result1['success'])
+        
+        # The failed attempt released the interval, so this one goes through
+        result2 = AnalyticsService.update_bot_description_with_count(
+            bot_instance=mock_bot,
+            config=config
+        )
+        self.assertTrue(result2['success'])
+        self.assertEqual(mock_bot.set_my_description.call_count, 2)
+    
     def test_invalid_template(self):
         """Test handling of invalid description template"""
         mock_bot = Mock()
@@ -260,7 +287,8 @@ class BotDescriptionUpdateTests(TestCase):
         
         # Pass None as bot_instance to test fallback behavior
         # The method should try to create a bot instance internally
-        with patch('telebot.TeleBot') as mock_bot_class:
+        with patch('bot.services.analytics_service._bot_instance', None), \
+                patch('bot.services.analytics_service.TeleBot') as mock_bot_class:
             mock_bot_class.side_effect = Exception("Bot creation failed")
             
             result = AnalyticsService.update_bot_description_with_count(
@@ -270,3 +298,4 @@ class BotDescriptionUpdateTests(TestCase):
             
             self.assertFalse(result['success'])
             self.assertIn('error', result)
+            self.assertEqual(result['message'], 'Failed to create bot instance')
@@ -2,171 +2,298 @@
 Unit tests for error handling in the monthly users count feature.
 Tests database failures, cache failures, and Telegram API errors.
 """
-import os
-import django
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.test_settings')
-django.setup()
+if __name__ == '__main__':
+    # Direct runs bootstrap Django themselves; pytest (conftest.py) and
+    # manage.py test configure it once per worker
+    import os
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.test_settings')
+    django.setup()
 
-from unittest.mock import Mock, patch, MagicMock
-from django.test import TestCase
+import contextlib
+import re
+from operator import itemgetter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import Mock, patch
+from django.test import SimpleTestCase, TestCase, override_settings
 from bot.models import User, UserInteraction
 from bot.services.analytics_service import AnalyticsService
 from django.core.cache import cache
-from django.db import DatabaseError, OperationalError
-import logging
+from django.core.cache.backends.base import BaseCache
+from django.db import DatabaseError
+
+
+# Pin the cache tests to an in-process cache, whatever the settings use
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analytics-error-tests',
+    }
+}
+
+
+class AlwaysFailingCache(BaseCache):
+    """Cache backend that is down: every operation raises ConnectionError"""
+    
+    def _fail(self, *args, **kwargs):
+        raise ConnectionError('cache down')
+    
+    # The remaining BaseCache operations (get_many, incr, has_key, ...)
+    # are built on these
+    add = get = set = touch = delete = clear = _fail
+
+
+# The whole cache backend unavailable, rather than one patched method
+FAILING_CACHES = {
+    'default': {
+        'BACKEND': f'{__name__}.AlwaysFailingCache',
+        'LOCATION': 'analytics-cache-down',
+    }
+}
+
+
+# Retry and backoff paths call time.sleep; run them without the real delay
+skip_sleep = patch('bot.services.analytics_service.time.sleep', lambda *args: None)
+
+
+# Fixed clock for the rate limit and retention tests (freezegun is not a
+# dependency); FROZEN_TIME is FROZEN_NOW as a Unix timestamp
+FROZEN_NOW = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+FROZEN_TIME = 1735689600
+
+
+def freeze_clock(test):
+    """Run a test with the analytics service's clocks stopped at FROZEN_NOW"""
+    test = patch('bot.services.analytics_service.timezone.now', lambda: FROZEN_NOW)(test)
+    return patch('bot.services.analytics_service.time.time', lambda: FROZEN_TIME)(test)
+
 
+# The only TeleBot method the description update calls; mocks built with
+# spec_set reject anything else instead of growing child mocks on access
+BOT_SPEC = ['set_my_description']
 
-class DatabaseErrorHandlingTests(TestCase):
+
+# Case-insensitive patterns for the result messages, compiled once
+RATE_LIMIT_RE = re.compile(r'rate[- ]?limit', re.I)
+RATE_LIMITED_RE = re.compile(r'rate[- ]?limited', re.I)
+PERMISSION_RE = re.compile(r'permission', re.I)
+DISABLED_RE = re.compile(r'disabled', re.I)
+FAILED_RE = re.compile(r'failed', re.I)
+TEMPLATE_RE = re.compile(r'template', re.I)
+SUCCESS_RE = re.compile(r'success', re.I)
+
+
+def clear_analytics_cache():
+    """
+    Delete the cache keys these tests read or write.
+    
+    Deleting them individually leaves the rest of a shared cache backend
+    alone, unlike cache.clear().
+    """
+    with contextlib.suppress(Exception):
+        mau_key = AnalyticsService.mau_cache_key()
+        total_key = AnalyticsService.CACHE_KEY_TOTAL_USERS
+        cache.delete_many([
+            mau_key,
+            mau_key + AnalyticsService.LOCK_SUFFIX,
+            AnalyticsService.CACHE_KEY_MAU + AnalyticsService.STALE_SUFFIX,
+            total_key,
+            total_key + AnalyticsService.LOCK_SUFFIX,
+            total_key + AnalyticsService.STALE_SUFFIX,
+            'bot_description_last_update',
+        ])
+
+
+class AnalyticsFixtureTestCase(TestCase):
+    """Base class that creates the shared test users with a single bulk INSERT"""
+    
+    databases = {'default'}
+    serialized_rollback = False
+    
+    # (telegram_id, username, first_name) of each fixture user, in the
+    # order they are unpacked below
+    FIXTURE_USERS = [
+        (12345, 'testuser', 'Test'),
+        (12346, 'cachetest', 'CacheTest'),
+        (12347, 'apitest', 'APITest'),
+        (12348, 'edgetest', 'EdgeTest'),
+        (12349, 'cachedown', 'CacheDown'),
+    ]
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the fixture users once for the class"""
+        super().setUpTestData()
+        cls.users = User.objects.bulk_create([
+            User(telegram_id=telegram_id, username=username, first_name=first_name, password='test')
+            for telegram_id, username, first_name in cls.FIXTURE_USERS
+        ])
+        cls.user_db, cls.user_cache, cls.user_api, cls.user_edge, cls.user_cache_down = cls.users
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@skip_sleep
+class DatabaseErrorHandlingTests(AnalyticsFixtureTestCase):
     """Tests for database connection failure scenarios"""
     
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user once for the class"""
+        super().setUpTestData()
+        cls.user = cls.user_db
+    
     def setUp(self):
         """Set up test fixtures"""
-        # Clear cache before each test
-        cache.clear()
-        # Create a test user
-        self.user = User.objects.create(
-            telegram_id=12345,
-            username='testuser',
-            first_name='Test',
-            password='test'
-        )
+        # Clear cache before each test (not rolled back with the database)
+        clear_analytics_cache()
     
     def tearDown(self):
         """Clean up after tests"""
-        cache.clear()
-    
-    def test_track_interaction_database_failure(self):
-        """Test that interaction tracking handles database failures gracefully"""
-        # Mock database error during interaction creation
-        with patch('bot.models.UserInteraction.objects.create', side_effect=DatabaseError("Connection lost")):
-            # Should not raise exception
-            result = AnalyticsService.track_user_interaction(self.user, 'message')
-            
-            # Should return None on failure
-            self.assertIsNone(result)
+        clear_analytics_cache()
     
-    def test_mau_count_database_failure_with_cache(self):
-        """Test MAU count falls back to cached value when database fails"""
-        # First, populate the cache with a known value
-        cache.set(AnalyticsService.CACHE_KEY_MAU, 42, AnalyticsService.CACHE_TIMEOUT)
-        
-        # Mock database error
-        with patch('bot.models.UserInteraction.objects.filter', side_effect=DatabaseError("Connection lost")):
-            # Should return cached value instead of raising exception
-            count = AnalyticsService.get_monthly_active_users_count()
-            self.assertEqual(count, 42)
+    # Cached MAU value before the failure (None = empty cache) -> expected count
+    MAU_DATABASE_FAILURE_CASES = [
+        (42, 42),
+        (None, 0),
+    ]
     
-    def test_mau_count_database_failure_without_cache(self):
-        """Test MAU count returns 0 when database fails and no cache exists"""
-        # Clear cache to ensure no cached value
-        cache.clear()
-        
-        # Mock database error
+    def test_mau_count_database_failure(self):
+        """Test MAU count falls back to the cached value, or 0 without one, when the database fails"""
+        # Mock database error once for every case
         with patch('bot.models.UserInteraction.objects.filter', side_effect=DatabaseError("Connection lost")):
-            # Should return 0 as fallback
-            count = AnalyticsService.get_monthly_active_users_count()
-            self.assertEqual(count, 0)
+            for cached_count, expected in self.MAU_DATABASE_FAILURE_CASES:
+                with self.subTest(cached_count=cached_count):
+                    clear_analytics_cache()
+                    if cached_count is not None:
+                        cache.set(AnalyticsService.mau_cache_key(), cached_count, AnalyticsService.CACHE_TIMEOUT)
+                    
+                    # Should return the fallback instead of raising exception
+                    count = AnalyticsService.get_monthly_active_users_count()
+                    self.assertEqual(count, expected)
     
-    def test_cleanup_database_failure(self):
-        """Test cleanup handles database failures gracefully"""
-        # Mock database error during cleanup
-        with patch('bot.models.UserInteraction.objects.filter', side_effect=DatabaseError("Connection lost")):
-            # Should not raise exception
-            deleted_count = AnalyticsService.cleanup_old_interactions(90)
-            
-            # Should return 0 on failure
-            self.assertEqual(deleted_count, 0)
-    
-    def test_admin_analytics_database_failure(self):
-        """Test admin analytics returns empty report on database failure"""
-        # Mock database error
-        with patch('bot.models.UserInteraction.objects.count', side_effect=DatabaseError("Connection lost")):
-            # Should not raise exception
-            report = AnalyticsService.get_admin_analytics_report()
-            
-            # Should return empty report structure
-            self.assertIsInstance(report, dict)
-            self.assertEqual(report['total_interactions'], 0)
-            self.assertEqual(report['monthly_active_users'], 0)
-            self.assertEqual(report['interaction_types_breakdown'], {})
+    def test_database_failures_degrade_gracefully(self):
+        """Test tracking, cleanup and the admin report fall back to empty results when the database fails"""
+        report_fields = itemgetter('total_interactions', 'monthly_active_users', 'interaction_types_breakdown')
+        # (patched call, service call, expected fallback)
+        cases = [
+            ('bot.models.UserInteraction.objects.create',
+             lambda: AnalyticsService.track_user_interaction(self.user, 'message'), None),
+            ('bot.services.analytics_service.connection.cursor',
+             lambda: AnalyticsService.cleanup_old_interactions(90), 0),
+            ('bot.models.UserInteraction.objects.count',
+             lambda: report_fields(AnalyticsService.get_admin_analytics_report()), (0, 0, {})),
+        ]
+        
+        for target, call, expected in cases:
+            with self.subTest(target=target), \
+                    patch(target, side_effect=DatabaseError("Connection lost")):
+                clear_analytics_cache()
+                
+                # Should return the fallback instead of raising exception
+                self.assertEqual(call(), expected)
 
 
-class CacheErrorHandlingTests(TestCase):
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheErrorHandlingTests(AnalyticsFixtureTestCase):
     """Tests for cache failure fallback behavior"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Clear cache and database
-        cache.clear()
+    # One interaction row per entry, inserted with a single bulk_create
+    FIXTURE_INTERACTION_TYPES = ('message',)
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and interactions once for the class"""
         UserInteraction.objects.all().delete()
         
-        # Create test user and interactions
-        self.user = User.objects.create(
-            telegram_id=12346,
-            username='cachetest',
-            first_name='CacheTest',
-            password='test'
-        )
-        UserInteraction.objects.create(user=self.user, interaction_type='message')
+        super().setUpTestData()
+        cls.user = cls.user_cache
+        UserInteraction.objects.bulk_create([
+            UserInteraction(user=cls.user, interaction_type=interaction_type)
+            for interaction_type in cls.FIXTURE_INTERACTION_TYPES
+        ])
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Clear cache before each test (not rolled back with the database)
+        clear_analytics_cache()
     
     def tearDown(self):
         """Clean up after tests"""
-        cache.clear()
-    
-    def test_mau_count_cache_get_failure(self):
-        """Test MAU count falls back to database when cache.get fails"""
-        # Mock cache.get to raise an exception
-        with patch('django.core.cache.cache.get', side_effect=Exception("Cache unavailable")):
-            # Should fall back to database query
-            count = AnalyticsService.get_monthly_active_users_count()
-            
-            # Should return the actual count from database
-            self.assertGreaterEqual(count, 0)
+        clear_analytics_cache()
     
     def test_mau_count_cache_set_failure(self):
         """Test MAU count still returns correct value when cache.set fails"""
-        # Clear cache first
-        cache.clear()
-        
         # Mock cache.set to raise an exception
-        with patch('django.core.cache.cache.set', side_effect=Exception("Cache unavailable")):
+        with patch('bot.services.analytics_service.cache.set', side_effect=Exception("Cache unavailable")):
             # Should still calculate and return the count
             count = AnalyticsService.get_monthly_active_users_count()
             
             # Should return the actual count from database
             self.assertGreaterEqual(count, 0)
     
+    def test_mau_count_serves_stale_value_while_recalculating(self):
+        """Test MAU count returns the stale value while another caller holds the lock"""
+        cache.set(AnalyticsService.mau_cache_key() + AnalyticsService.LOCK_SUFFIX, 1)
+        cache.set(AnalyticsService.CACHE_KEY_MAU + AnalyticsService.STALE_SUFFIX, 7)
+        
+        with patch.object(AnalyticsService, 'LOCK_WAIT', 0), \
+                patch('bot.models.UserInteraction.objects.filter') as mock_filter:
+            count = AnalyticsService.get_monthly_active_users_count()
+        
+        self.assertEqual(count, 7)
+        mock_filter.assert_not_called()
+    
+    def test_mau_count_database_failure_with_stale_value(self):
+        """Test MAU count falls back to the stale value when the database fails"""
+        cache.set(AnalyticsService.CACHE_KEY_MAU + AnalyticsService.STALE_SUFFIX, 7)
+        
+        with patch('bot.models.UserInteraction.objects.filter', side_effect=DatabaseError("Connection lost")):
+            count = AnalyticsService.get_monthly_active_users_count()
+        
+        self.assertEqual(count, 7)
+
+
+@override_settings(CACHES=FAILING_CACHES)
+class CacheDownTests(AnalyticsFixtureTestCase):
+    """Tests for analytics with the whole cache backend unavailable"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and interaction once for the class"""
+        super().setUpTestData()
+        cls.user = cls.user_cache_down
+        UserInteraction.objects.create(user=cls.user, interaction_type='message')
+    
+    def test_mau_count_uses_database(self):
+        """Test MAU count is calculated from the database when the cache is down"""
+        count = AnalyticsService.get_monthly_active_users_count()
+        self.assertEqual(count, 1)
+    
+    def test_total_users_count_uses_database(self):
+        """Test total users count is calculated from the database when the cache is down"""
+        count = AnalyticsService.get_total_registered_users_count()
+        self.assertEqual(count, User.objects.count())
+    
     def test_cache_clear_failure(self):
         """Test that cache clear failures don't break the system"""
-        # Mock cache.delete to raise an exception
-        with patch('django.core.cache.cache.delete', side_effect=Exception("Cache unavailable")):
-            # Should not raise exception
-            try:
-                AnalyticsService.clear_cache()
-            except Exception as e:
-                self.fail(f"clear_cache raised exception: {e}")
+        # Should not raise exception
+        try:
+            AnalyticsService.clear_cache()
+        except Exception as e:
+            self.fail(f"clear_cache raised exception: {e}")
 
 
-class TelegramAPIErrorHandlingTests(TestCase):
-    """Tests for Telegram API error handling"""
+@override_settings(CACHES=LOCMEM_CACHES)
+class BotDescriptionConfigTests(SimpleTestCase):
+    """Tests for the bot description config and rate limit checks (no database)"""
     
     def setUp(self):
         """Set up test fixtures"""
-        cache.clear()
-        # Create test user
-        self.user = User.objects.create(
-            telegram_id=12347,
-            username='apitest',
-            first_name='APITest',
-            password='test'
-        )
-        UserInteraction.objects.create(user=self.user, interaction_type='message')
+        clear_analytics_cache()
     
     def tearDown(self):
         """Clean up after tests"""
-        cache.clear()
+        clear_analytics_cache()
     
     def test_bot_description_update_disabled(self):
         """Test bot description update when disabled in config"""
@@ -174,13 +301,13 @@ class TelegramAPIErrorHandlingTests(TestCase):
         result = AnalyticsService.update_bot_description_with_count(config=config)
         
         self.assertFalse(result['success'])
-        self.assertIn('disabled', result['message'].lower())
+        self.assertRegex(result['message'], DISABLED_RE)
     
+    @freeze_clock
     def test_bot_description_update_rate_limited(self):
         """Test bot description update respects rate limiting"""
         # Set last update time to now
-        import time
-        cache.set('bot_description_last_update', time.time(), timeout=None)
+        cache.set('bot_description_last_update', FROZEN_TIME, timeout=None)
         
         config = {
             'enabled': True,
@@ -190,71 +317,103 @@ class TelegramAPIErrorHandlingTests(TestCase):
         result = AnalyticsService.update_bot_description_with_count(config=config)
         
         self.assertFalse(result['success'])
-        self.assertIn('rate limited', result['message'].lower())
+        self.assertRegex(result['message'], RATE_LIMITED_RE)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@skip_sleep
+class TelegramAPIErrorHandlingTests(AnalyticsFixtureTestCase):
+    """Tests for Telegram API error handling"""
     
-    def test_bot_description_update_telegram_rate_limit(self):
-        """Test handling of Telegram API rate limit (429 error)"""
-        mock_bot = Mock()
-        mock_bot.set_my_description.side_effect = Exception("429 Too Many Requests")
+    # One interaction row per entry, inserted with a single bulk_create
+    FIXTURE_INTERACTION_TYPES = ('message',)
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and interaction once for the class"""
+        super().setUpTestData()
+        cls.user = cls.user_api
+        UserInteraction.objects.bulk_create([
+            UserInteraction(user=cls.user, interaction_type=interaction_type)
+            for interaction_type in cls.FIXTURE_INTERACTION_TYPES
+        ])
         
+        # Every test here reads the MAU count the same fixtures produce, so
+        # calculate it once and let the tests hit the cache
+        clear_analytics_cache()
+        AnalyticsService.get_monthly_active_users_count()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Drop the primed MAU count before the cache override ends"""
+        clear_analytics_cache()
+        super().tearDownClass()
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Only the description update claim; clear_analytics_cache() would
+        # also drop the MAU count primed in setUpTestData
+        cache.delete('bot_description_last_update')
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        cache.delete('bot_description_last_update')
+    
+    # Telegram failure -> pattern the result message must match
+    API_ERROR_CASES = [
+        ("429 Too Many Requests", RATE_LIMIT_RE),
+        ("403 Forbidden", PERMISSION_RE),
+        ("Network error", FAILED_RE),
+    ]
+    
+    def test_bot_description_update_api_errors(self):
+        """Test handling of Telegram rate limit (429), permission (403) and generic API errors"""
         config = {
             'enabled': True,
-            'retry_attempts': 1,
+            'retry_attempts': 2,
             'retry_delay': 0
         }
         
-        result = AnalyticsService.update_bot_description_with_count(
-            bot_instance=mock_bot,
-            config=config
-        )
-        
-        self.assertFalse(result['success'])
-        self.assertIn('rate limit', result['message'].lower())
-        self.assertIn('error', result)
+        for error_message, expected in self.API_ERROR_CASES:
+            with self.subTest(error=error_message):
+                # A rate-limited update keeps its claim on the interval
+                cache.delete('bot_description_last_update')
+                mock_bot = Mock(spec_set=BOT_SPEC)
+                mock_bot.set_my_description.side_effect = Exception(error_message)
+                
+                result = AnalyticsService.update_bot_description_with_count(
+                    bot_instance=mock_bot,
+                    config=config
+                )
+                
+                self.assertFalse(result['success'])
+                self.assertRegex(result['message'], expected)
+                self.assertIn('error', result)
     
-    def test_bot_description_update_permission_error(self):
-        """Test handling of Telegram API permission error (403)"""
-        mock_bot = Mock()
-        mock_bot.set_my_description.side_effect = Exception("403 Forbidden")
-        
+    def test_bot_description_claim_kept_after_telegram_rate_limit(self):
+        """Test only failures other than a Telegram rate limit free the update interval"""
         config = {
             'enabled': True,
             'retry_attempts': 1,
             'retry_delay': 0
         }
         
-        result = AnalyticsService.update_bot_description_with_count(
-            bot_instance=mock_bot,
-            config=config
-        )
-        
-        self.assertFalse(result['success'])
-        self.assertIn('permission', result['message'].lower())
-        self.assertIn('error', result)
-    
-    def test_bot_description_update_generic_api_error(self):
-        """Test handling of generic Telegram API errors"""
-        mock_bot = Mock()
+        mock_bot = Mock(spec_set=BOT_SPEC)
         mock_bot.set_my_description.side_effect = Exception("Network error")
+        AnalyticsService.update_bot_description_with_count(bot_instance=mock_bot, config=config)
+        self.assertIsNone(cache.get('bot_description_last_update'))
         
-        config = {
-            'enabled': True,
-            'retry_attempts': 2,
-            'retry_delay': 0
-        }
-        
-        result = AnalyticsService.update_bot_description_with_count(
-            bot_instance=mock_bot,
-            config=config
-        )
+        mock_bot.set_my_description.side_effect = Exception("429 Too Many Requests")
+        AnalyticsService.update_bot_description_with_count(bot_instance=mock_bot, config=config)
+        self.assertIsNotNone(cache.get('bot_description_last_update'))
         
-        self.assertFalse(result['success'])
-        self.assertIn('failed', result['message'].lower())
-        self.assertIn('error', result)
+        result = AnalyticsService.update_bot_description_with_count(bot_instance=mock_bot, config=config)
+        self.assertRegex(result['message'], RATE_LIMITED_RE)
+        self.assertEqual(mock_bot.set_my_description.call_count, 2)
     
     def test_bot_description_update_invalid_template(self):
         """Test handling of invalid description template"""
-        mock_bot = Mock()
+        mock_bot = Mock(spec_set=BOT_SPEC)
         
         config = {
             'enabled': True,
@@ -268,11 +427,11 @@ class TelegramAPIErrorHandlingTests(TestCase):
         )
         
         self.assertFalse(result['success'])
-        self.assertIn('template', result['message'].lower())
+        self.assertRegex(result['message'], TEMPLATE_RE)
     
     def test_bot_description_update_success_after_retry(self):
         """Test successful update after initial failure"""
-        mock_bot = Mock()
+        mock_bot = Mock(spec_set=BOT_SPEC)
         # First call fails, second succeeds
         mock_bot.set_my_description.side_effect = [
             Exception("Temporary error"),
@@ -291,10 +450,24 @@ class TelegramAPIErrorHandlingTests(TestCase):
         )
         
         self.assertTrue(result['success'])
-        self.assertIn('success', result['message'].lower())
+        self.assertRegex(result['message'], SUCCESS_RE)
+    
+    def test_bot_description_update_uses_primed_count(self):
+        """Test the description update reads the primed MAU count without querying"""
+        mock_bot = Mock(spec_set=BOT_SPEC)
+        
+        with self.assertNumQueries(0):
+            result = AnalyticsService.update_bot_description_with_count(
+                bot_instance=mock_bot,
+                config={'enabled': True}
+            )
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['count'], 1)
 
 
-class EdgeCaseHandlingTests(TestCase):
+@skip_sleep
+class EdgeCaseHandlingTests(AnalyticsFixtureTestCase):
     """Tests for edge cases and invalid data handling"""
     
     def test_track_interaction_with_none_user(self):
@@ -305,12 +478,7 @@ class EdgeCaseHandlingTests(TestCase):
     
     def test_track_interaction_with_invalid_type(self):
         """Test tracking interaction with invalid type"""
-        user = User.objects.create(
-            telegram_id=12348,
-            username='edgetest',
-            first_name='EdgeTest',
-            password='test'
-        )
+        user = self.user_edge
         
         # Should handle empty string gracefully (returns None)
         result = AnalyticsService.track_user_interaction(user, '')
@@ -322,6 +490,35 @@ class EdgeCaseHandlingTests(TestCase):
         # May fail due to max_length constraint, should handle gracefully
         # Result could be None if it fails
     
+    def create_cleanup_interactions(self):
+        """Create one interaction a day before FROZEN_NOW and one a day after"""
+        user = self.user_edge
+        UserInteraction.objects.bulk_create([
+            UserInteraction(user=user, interaction_type='message', timestamp=FROZEN_NOW - timedelta(days=1)),
+            UserInteraction(user=user, interaction_type='message', timestamp=FROZEN_NOW + timedelta(days=1)),
+        ])
+    
+    @freeze_clock
+    def test_cleanup_with_negative_days(self):
+        """Test cleanup with negative retention days removes everything up to the future cutoff"""
+        self.create_cleanup_interactions()
+        
+        deleted_count = AnalyticsService.cleanup_old_interactions(-10)
+        self.assertEqual(deleted_count, 2)
+    
+    @freeze_clock
+    def test_cleanup_with_zero_days(self):
+        """Test cleanup with zero retention days keeps interactions from now on"""
+        self.create_cleanup_interactions()
+        
+        deleted_count = AnalyticsService.cleanup_old_interactions(0)
+        self.assertEqual(deleted_count, 1)
+        self.assertTrue(UserInteraction.objects.filter(timestamp__gt=FROZEN_NOW).exists())
+
+
+class FormatterTests(SimpleTestCase):
+    """Tests for user count formatting edge cases (no database)"""
+    
     def test_format_user_count_negative(self):
         """Test formatting negative user counts"""
         # Should handle negative numbers gracefully
@@ -344,18 +541,6 @@ class EdgeCaseHandlingTests(TestCase):
         config = {'format': 'full'}
         display = AnalyticsService.format_display(100, config)
         self.assertIn('100', display)
-    
-    def test_cleanup_with_negative_days(self):
-        """Test cleanup with negative retention days"""
-        # Should handle gracefully
-        deleted_count = AnalyticsService.cleanup_old_interactions(-10)
-        self.assertGreaterEqual(deleted_count, 0)
-    
-    def test_cleanup_with_zero_days(self):
-        """Test cleanup with zero retention days"""
-        # Should handle gracefully
-        deleted_count = AnalyticsService.cleanup_old_interactions(0)
-        self.assertGreaterEqual(deleted_count, 0)
 
 
 if __name__ == '__main__':
@@ -14,6 +14,8 @@ from bot.models import User, UserInteraction
 from bot.services.analytics_service import AnalyticsService
 from telebot.types import Message, CallbackQuery
 from datetime import datetime
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase
 
 
 @pytest.mark.django_db
@@ -164,6 +166,233 @@ def test_tracking_non_blocking():
         raise
 
 
+
+@pytest.mark.django_db
+def test_buffered_interactions_flush_in_one_batch():
+    """Test that buffered interactions are written by a single flush."""
+    print("Testing buffered interaction writes...")
+    
+    user = User.objects.create(
+        telegram_id=12350,
+        username='testuser_buffered',
+        first_name='Buffered',
+        password='test'
+    )
+    
+    with patch.object(AnalyticsService, 'INTERACTION_FLUSH_INTERVAL', 3600):
+        AnalyticsService.record_interaction(user.pk, 'message')
+        AnalyticsService.record_interaction(user.pk, 'command_start')
+    
+    # Nothing is written until the buffer is flushed
+    assert UserInteraction.objects.filter(user=user).count() == 0
+    
+    assert AnalyticsService.flush_interactions() == 2
+    assert UserInteraction.objects.filter(user=user).count() == 2
+    assert user.daily_activity.get().interaction_count == 2
+    
+    print("✓ Buffered interactions flush correctly")
+    
+    # Cleanup
+    user.delete()
+
+
+@pytest.mark.django_db
+def test_failed_flush_is_retried():
+    """Test that a failed flush keeps the interactions for the next flush."""
+    print("Testing buffered interaction retries...")
+    
+    user = User.objects.create(
+        telegram_id=12351,
+        username='testuser_retry',
+        first_name='Retry',
+        password='test'
+    )
+    
+    with patch.object(AnalyticsService, 'INTERACTION_FLUSH_INTERVAL', 3600):
+        AnalyticsService.record_interaction(user.pk, 'message')
+        AnalyticsService.record_interaction(user.pk, 'command_start')
+    
+    with patch('bot.models.UserInteraction.objects.bulk_create', side_effect=OperationalError("Connection lost")):
+        assert AnalyticsService.flush_interactions() == 0
+    
+    assert UserInteraction.objects.filter(user=user).count() == 0
+    
+    # The next flush writes the requeued rows
+    assert AnalyticsService.flush_interactions() == 2
+    assert UserInteraction.objects.filter(user=user).count() == 2
+    
+    print("✓ Failed flushes are retried")
+    
+    # Cleanup
+    user.delete()
+
+
+@pytest.mark.django_db
+def test_failed_flush_not_retried_inline():
+    """Test that a failed flush leaves the retry to the background flusher."""
+    print("Testing flush backoff...")
+    
+    user = User.objects.create(
+        telegram_id=12354,
+        username='testuser_backoff',
+        first_name='Backoff',
+        password='test'
+    )
+    
+    with patch.object(AnalyticsService, 'INTERACTION_FLUSH_INTERVAL', 3600), \
+            patch.object(AnalyticsService, 'INTERACTION_BUFFER_SIZE', 1):
+        with patch('bot.models.UserInteraction.objects.bulk_create', side_effect=OperationalError("Connection lost")) as mock_bulk_create:
+            AnalyticsService.record_interaction(user.pk, 'message')
+            AnalyticsService.record_interaction(user.pk, 'command_start')
+            
+            # Only the first record flushed; the second waits for the backoff
+            assert mock_bulk_create.call_count == 1
+        
+        # The background flusher still retries, and writes both rows
+        assert AnalyticsService.flush_interactions() == 2
+    
+    assert UserInteraction.objects.filter(user=user).count() == 2
+    
+    print("✓ Failed flushes are not retried inline")
+    
+    # Cleanup
+    user.delete()
+
+
+@pytest.mark.django_db
+def test_deleted_user_does_not_block_flush():
+    """Test that rows of a deleted user are dropped instead of failing every flush."""
+    print("Testing flush with a deleted user...")
+    
+    user = User.objects.create(
+        telegram_id=12355,
+        username='testuser_kept',
+        first_name='Kept',
+        password='test'
+    )
+    deleted_user = User.objects.create(
+        telegram_id=12356,
+        username='testuser_deleted',
+        first_name='Deleted',
+        password='test'
+    )
+    
+    with patch.object(AnalyticsService, 'INTERACTION_FLUSH_INTERVAL', 3600):
+        AnalyticsService.record_interaction(user.pk, 'message')
+        AnalyticsService.record_interaction(deleted_user.pk, 'message')
+    deleted_user.delete()
+    
+    # The first insert hits the foreign key of the deleted user
+    bulk_create = UserInteraction.objects.bulk_create
+    calls = []
+    
+    def fail_first_insert(objs, **kwargs):
+        calls.append(len(objs))
+        if len(calls) == 1:
+            raise IntegrityError("violates foreign key constraint")
+        return bulk_create(objs, **kwargs)
+    
+    with patch('bot.models.UserInteraction.objects.bulk_create', side_effect=fail_first_insert):
+        assert AnalyticsService.flush_interactions() == 1
+    
+    assert calls == [2, 1]
+    assert UserInteraction.objects.filter(user=user).count() == 1
+    
+    # Nothing is left in the buffer to fail the next flush
+    assert AnalyticsService.flush_interactions() == 0
+    
+    print("✓ Deleted users don't block flushes")
+    
+    # Cleanup
+    user.delete()
+
+
+@pytest.mark.django_db
+def test_interaction_bursts_recorded_once():
+    """Test that repeats of a low-value interaction within the dedupe window are skipped."""
+    print("Testing interaction burst deduplication...")
+    
+    user = User.objects.create(
+        telegram_id=12352,
+        username='testuser_burst',
+        first_name='Burst',
+        password='test'
+    )
+    
+    from bot.bot import track_interaction
+    
+    with patch.object(AnalyticsService, 'INTERACTION_DEDUPE_WINDOW', 60):
+        track_interaction(user.telegram_id, 'button_like_comment')
+        track_interaction(user.telegram_id, 'button_like_comment')
+        track_interaction(user.telegram_id, 'message')
+        track_interaction(user.telegram_id, 'message')
+    
+    assert UserInteraction.objects.filter(user=user, interaction_type='button_like_comment').count() == 1
+    
+    # Other interaction types are always recorded
+    assert UserInteraction.objects.filter(user=user, interaction_type='message').count() == 2
+    
+    print("✓ Interaction bursts are recorded once")
+    
+    # Cleanup
+    user.delete()
+
+
+@pytest.mark.django_db
+def test_user_lookup_cached_by_telegram_id():
+    """Test that tracking reuses the cached user id and forgets deleted users."""
+    print("Testing cached user lookup...")
+    
+    user = User.objects.create(
+        telegram_id=12353,
+        username='testuser_cached',
+        first_name='Cached',
+        password='test'
+    )
+    
+    from bot.bot import track_interaction
+    from bot.services.user_service import get_user_pk
+    
+    # The id is only cached once the lookup's transaction commits
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        track_interaction(user.telegram_id, 'message')
+    
+    # The users table is no longer read once the id is cached
+    with patch.object(User.objects, 'filter', side_effect=AssertionError("users table queried")):
+        track_interaction(user.telegram_id, 'command_start')
+    
+    assert UserInteraction.objects.filter(user=user, interaction_type='command_start').count() == 1
+    
+    # Deleting the user drops the cached id
+    user.delete()
+    assert get_user_pk(12353) is None
+    
+    print("✓ User lookups are cached")
+
+
+@pytest.mark.django_db
+def test_missing_user_drops_cached_id():
+    """A write that hits a missing user drops the cached id instead of retrying."""
+    print("Testing stale cached user id...")
+    
+    from django.core.cache import cache
+    from bot.bot import track_interaction
+    from bot.services.user_service import _user_pk_cache_key
+    
+    # Cached id of a user row that no longer exists
+    cache.set(_user_pk_cache_key(12354), 999999)
+    
+    with patch.object(UserInteraction.objects, 'create', side_effect=IntegrityError("FOREIGN KEY constraint failed")) as create, \
+         patch('bot.services.analytics_service.time.sleep') as sleep:
+        track_interaction(12354, 'message')
+    
+    assert create.call_count == 1
+    sleep.assert_not_called()
+    assert cache.get(_user_pk_cache_key(12354)) is None
+    
+    print("✓ Stale cached user ids are dropped")
+
+
 if __name__ == '__main__':
     print("Running interaction tracking tests...\n")
     
@@ -173,6 +402,13 @@ if __name__ == '__main__':
         test_track_command_interaction()
         test_track_button_interaction()
         test_tracking_non_blocking()
+        test_buffered_interactions_flush_in_one_batch()
+        test_failed_flush_is_retried()
+        test_failed_flush_not_retried_inline()
+        test_deleted_user_does_not_block_flush()
+        test_interaction_bursts_recorded_once()
+        test_user_lookup_cached_by_telegram_id()
+        test_missing_user_drops_cached_id()
         
         print("\n✅ All interaction tracking tests passed!")
     except Exception as e:
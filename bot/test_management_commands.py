@@ -15,8 +15,9 @@ from django.core.management import call_command
 from django.utils import timezone
 from django.core.cache import cache
 from datetime import timedelta
-from bot.models import User, UserInteraction
+from bot.models import AnalyticsSnapshot, InteractionTypeSnapshot, User, UserInteraction, UserInteractionDailyActive
 from bot.services.analytics_service import AnalyticsService
+from bot.tasks import get_analytics_snapshot
 
 
 class CleanupOldInteractionsCommandTests(TestCase):
@@ -171,6 +172,28 @@ class CleanupOldInteractionsCommandTests(TestCase):
         # Check output
         output = out.getvalue()
         self.assertIn('Successfully deleted 0 interactions', output)
+    
+    def test_cleanup_deletes_expired_daily_activity(self):
+        """Test cleanup also removes daily activity rollup rows past the retention period"""
+        today = timezone.now().date()
+        recent_day = UserInteractionDailyActive.objects.create(
+            user=self.user1,
+            date=today - timedelta(days=10),
+            interaction_count=1
+        )
+        UserInteractionDailyActive.objects.create(
+            user=self.user2,
+            date=today - timedelta(days=100),
+            interaction_count=3
+        )
+        
+        call_command('cleanup_old_interactions', stdout=StringIO())
+        
+        # Only the rollup row inside the retention period is kept
+        self.assertEqual(
+            list(UserInteractionDailyActive.objects.values_list('pk', flat=True)),
+            [recent_day.pk]
+        )
 
 
 class UpdateMAUCountCommandTests(TestCase):
@@ -204,6 +227,7 @@ class UpdateMAUCountCommandTests(TestCase):
         self.user1.delete()
         self.user2.delete()
         AnalyticsService.clear_cache()
+        AnalyticsSnapshot.objects.all().delete()
     
     def test_update_mau_count_basic(self):
         """Test basic MAU count update"""
@@ -261,6 +285,53 @@ class UpdateMAUCountCommandTests(TestCase):
         self.assertIn('Monthly Active Users', output)
         self.assertIn('Total Interactions', output)
     
+    def test_update_mau_count_refresh_snapshot(self):
+        """Test the analytics snapshot is stored and then printed from the database"""
+        UserInteraction.objects.create(
+            user=self.user1,
+            interaction_type='message'
+        )
+        
+        out = StringIO()
+        call_command('update_mau_count', refresh_snapshot=True, stdout=out)
+        
+        self.assertIn('Analytics snapshot refreshed', out.getvalue())
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 1)
+        snapshot = get_analytics_snapshot()
+        self.assertEqual(snapshot['total_all'], 1)
+        self.assertEqual(snapshot['interaction_types'], [('message', 1)])
+        self.assertEqual(
+            list(InteractionTypeSnapshot.objects.values_list('interaction_type', 'count')),
+            [('message', 1)]
+        )
+        
+        # The admin report reads the breakdown from the snapshot table
+        UserInteraction.objects.create(user=self.user1, interaction_type='message')
+        report = AnalyticsService.get_admin_analytics_report()
+        self.assertEqual(report['interaction_types_breakdown'], {'message': 1})
+        
+        # A verbose run reuses the snapshot instead of querying again
+        out = StringIO()
+        call_command('update_mau_count', verbose=True, stdout=out)
+        self.assertIn(f'Snapshot generated at: {snapshot["generated_at"]}', out.getvalue())
+    
+    def test_update_mau_count_verbose_query_count(self):
+        """Test the verbose statistics stay within a fixed number of queries"""
+        UserInteraction.objects.create(
+            user=self.user1,
+            interaction_type='message'
+        )
+        
+        # Cold: MAU count, snapshot lookup, rollup aggregate, interaction
+        # aggregate, interaction type breakdown, and storing the snapshot
+        # (savepoint, delete, insert, release)
+        with self.assertNumQueries(9):
+            call_command('update_mau_count', verbose=True, stdout=StringIO())
+        
+        # Warm: MAU count from cache, statistics from the stored snapshot
+        with self.assertNumQueries(1):
+            call_command('update_mau_count', verbose=True, stdout=StringIO())
+    
     def test_update_mau_count_no_cache(self):
         """Test MAU count update with no-cache flag"""
         # Create interaction
@@ -277,7 +348,7 @@ class UpdateMAUCountCommandTests(TestCase):
         AnalyticsService.get_monthly_active_users_count()
         
         # Verify cache is set
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertIsNotNone(cached_value)
         
         # Run update command with no-cache flag
@@ -301,6 +372,17 @@ class UpdateMAUCountCommandTests(TestCase):
         self.assertIn('Monthly Active Users: 0', output)
 
 
+class ManageInteractionPartitionsCommandTests(TestCase):
+    """Tests for manage_interaction_partitions management command"""
+    
+    def test_skips_without_postgresql(self):
+        """Test the command leaves non-PostgreSQL databases untouched"""
+        out = StringIO()
+        call_command('manage_interaction_partitions', stdout=out)
+        
+        self.assertIn('Partitioning requires PostgreSQL', out.getvalue())
+
+
 class RegenerateMAUCacheCommandTests(TestCase):
     """Tests for regenerate_mau_cache management command"""
     
@@ -339,7 +421,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         )
         
         # Verify cache is empty
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertIsNone(cached_value)
         
         # Run regenerate command
@@ -347,7 +429,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         call_command('regenerate_mau_cache', stdout=out)
         
         # Verify cache is now set
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertIsNotNone(cached_value)
         self.assertEqual(cached_value, 1)
         
@@ -374,7 +456,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         AnalyticsService.get_monthly_active_users_count()
         
         # Verify cache is set
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertIsNotNone(cached_value)
         
         # Run regenerate with clear-only flag
@@ -382,7 +464,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         call_command('regenerate_mau_cache', clear_only=True, stdout=out)
         
         # Verify cache is cleared
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertIsNone(cached_value)
         
         # Check output
@@ -404,10 +486,10 @@ class RegenerateMAUCacheCommandTests(TestCase):
         )
         
         # Set incorrect cache value manually
-        cache.set(AnalyticsService.CACHE_KEY_MAU, 999, AnalyticsService.CACHE_TIMEOUT)
+        cache.set(AnalyticsService.mau_cache_key(), 999, AnalyticsService.CACHE_TIMEOUT)
         
         # Verify incorrect value is cached
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertEqual(cached_value, 999)
         
         # Run regenerate command
@@ -415,7 +497,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         call_command('regenerate_mau_cache', stdout=out)
         
         # Verify cache now has correct value
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertEqual(cached_value, 1)
         
         # Check output
@@ -431,7 +513,7 @@ class RegenerateMAUCacheCommandTests(TestCase):
         call_command('regenerate_mau_cache', stdout=out)
         
         # Verify cache is set to 0
-        cached_value = cache.get(AnalyticsService.CACHE_KEY_MAU)
+        cached_value = cache.get(AnalyticsService.mau_cache_key())
         self.assertEqual(cached_value, 0)
         
         # Check output
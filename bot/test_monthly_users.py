@@ -279,6 +279,37 @@ class CachingBehaviorTests(TestCase):
         AnalyticsService.clear_cache()
         new_count = AnalyticsService.get_monthly_active_users_count()
         self.assertEqual(new_count, first_count)
+    
+    def test_clear_cache_switches_to_new_key(self):
+        """
+        Clearing the cache moves readers to a new key and keeps the stale copy.
+        """
+        from bot.services.analytics_service import AnalyticsService
+        from django.core.cache import cache
+        
+        old_key = AnalyticsService.mau_cache_key()
+        cache.set(old_key, 123)
+        cache.set(AnalyticsService.CACHE_KEY_MAU + AnalyticsService.STALE_SUFFIX, 123)
+        
+        AnalyticsService.clear_cache()
+        
+        new_key = AnalyticsService.mau_cache_key()
+        self.assertNotEqual(new_key, old_key)
+        self.assertIsNone(cache.get(new_key))
+        self.assertEqual(AnalyticsService._get_stale(AnalyticsService.CACHE_KEY_MAU), 123)
+    
+    @given(base=st.integers(min_value=60, max_value=86400))
+    def test_cache_timeout_jitter_bounds(self, base):
+        """
+        Jittered cache timeouts stay within +/-10% of the base timeout.
+        """
+        from bot.services.analytics_service import AnalyticsService
+        
+        ttl = AnalyticsService._jittered_ttl(base)
+        
+        # Allow one second either way for float rounding
+        self.assertGreaterEqual(ttl, base * 0.9 - 1)
+        self.assertLessEqual(ttl, base * 1.1 + 1)
 
 
 
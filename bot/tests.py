@@ -159,7 +159,7 @@ class ImpactPointsTests(TestCase):
                 )
         
         # Calculate impact points
-        impact_points = calculate_impact_points(user)
+        impact_points = calculate_impact_points(user)['impact_points']
         
         # Expected impact points
         expected_impact = num_confessions + num_comments + min(num_likes, num_comments)
@@ -491,6 +491,18 @@ class ReactionUniquenessTests(TestCase):
         self.assertEqual(comment.like_count, expected_likes)
         self.assertEqual(comment.dislike_count, expected_dislikes)
         self.assertEqual(comment.report_count, expected_reports)
+    
+    def test_reaction_unique_together_matches_migration(self):
+        """
+        Reaction allows one row per reaction type, as set by migration 0003,
+        so a report can coexist with a like or dislike.
+        """
+        from bot.models import Reaction
+        
+        self.assertEqual(
+            Reaction._meta.unique_together,
+            (('comment', 'user', 'reaction_type'),)
+        )
 
 
 class InvalidCommandTests(TestCase):
@@ -26,6 +26,47 @@ def check_database_connection():
     return True
 
 
+def estimate_row_count(model, min_rows=0):
+    """
+    Get a fast row count for a model's table.
+    
+    On PostgreSQL this reads the planner's estimate from pg_class, which is
+    O(1) instead of the full scan done by COUNT(*). A partitioned table has
+    no estimate of its own, so its leaf partitions' estimates are summed.
+    Other backends, tables that have never been analyzed, and estimates
+    below min_rows (where the estimate is too rough to show) fall back to
+    an exact count.
+    
+    Args:
+        model: Django model class
+        min_rows (int): Smallest estimate returned as is (default: 0)
+    
+    Returns:
+        int: Estimated number of rows
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # pg_partition_tree lists a plain table as its own only leaf.
+            # reltuples is -1 until a table is first analyzed, which new
+            # empty partitions may never be, so those count as 0 as long as
+            # some leaf has been analyzed.
+            cursor.execute(
+                """
+                SELECT CASE WHEN max(pg_class.reltuples) < 0 THEN -1
+                            ELSE sum(greatest(pg_class.reltuples, 0)) END::bigint
+                FROM pg_partition_tree(to_regclass(%s)) tree
+                JOIN pg_class ON pg_class.oid = tree.relid
+                WHERE tree.isleaf
+                """,
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row is not None and row[0] is not None and row[0] >= min_rows:
+            return row[0]
+    
+    return model.objects.count()
+
+
 def retry_db_operation(max_retries=3, initial_delay=1.0, backoff_factor=2.0):
     """
     Decorator to retry database operations with exponential backoff.
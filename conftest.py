@@ -3,9 +3,29 @@ Pytest configuration for Django tests.
 """
 import os
 import django
+import pytest
 
 # Configure Django settings before running tests
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.test_settings')
 
 # Setup Django
 django.setup()
+
+
+@pytest.fixture(autouse=True)
+def clear_cached_user_pks():
+    """
+    Drop Telegram ID -> user id cache entries after each test.
+    
+    Test databases reuse primary keys, so an entry left behind by one test
+    would point another test's interactions at a missing or different user.
+    Other cache entries are left alone.
+    """
+    yield
+    
+    from django.core.cache import cache
+    from bot.services.user_service import USER_PK_CACHE_PREFIX
+    
+    # LocMemCache stores keys as "<key_prefix>:<version>:<key>"
+    keys = [key.split(':', 2)[-1] for key in list(getattr(cache, '_cache', {}))]
+    cache.delete_many([key for key in keys if key.startswith(USER_PK_CACHE_PREFIX)])
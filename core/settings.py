@@ -18,7 +18,8 @@ BOT_TOKEN = get_env("BOT_TOKEN")
 BOT_USERNAME = os.environ.get("BOT_USERNAME", "your_bot")  # Bot username without @
 WEB_HOOK_URL = os.environ.get("WEB_HOOK_URL", "https://newbot-drab.vercel.app/webhook/")
 CHANNEL_ID = os.environ.get("CHANNEL_ID")
-ADMINS = [int(admin_id.strip()) for admin_id in os.environ.get("ADMINS", "").split(",") if admin_id.strip()]
+# frozenset: admin checks run on every incoming update, keep membership O(1)
+ADMINS = frozenset(int(admin_id.strip()) for admin_id in os.environ.get("ADMINS", "").split(",") if admin_id.strip())
 
 DEBUG = False  # Vercel = always production
 
@@ -81,6 +82,8 @@ WSGI_APPLICATION = "core.wsgi.application"
 # -----------------------------
 # 🔥 FORCE POSTGRES ON VERCEL
 # -----------------------------
+PGPORT = os.environ.get("PGPORT", "5432")  # Support both direct (5432) and pooler (6543)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -88,12 +91,19 @@ DATABASES = {
         "USER": get_env("PGUSER"),
         "PASSWORD": get_env("PGPASSWORD"),
         "HOST": get_env("PGHOST"),
-        "PORT": os.environ.get("PGPORT", "5432"),  # Support both direct (5432) and pooler (6543)
+        "PORT": PGPORT,
         "OPTIONS": {
             "sslmode": "require",
             "connect_timeout": 10,
         },
-        "CONN_MAX_AGE": 0,  # Don't persist connections in serverless
+        # Don't persist connections in serverless (default); long-running
+        # deployments can set DB_CONN_MAX_AGE (seconds) to reuse them
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "0")),
+        # Check a reused connection is still alive before handing it out
+        "CONN_HEALTH_CHECKS": True,
+        # The pooler on 6543 runs in transaction mode, which can't keep the
+        # named cursors that QuerySet.iterator() would otherwise open
+        "DISABLE_SERVER_SIDE_CURSORS": PGPORT == "6543",
     }
 }
 
@@ -22,3 +22,32 @@ DATABASES = {
 
 # Disable debug for tests
 DEBUG = True
+
+# Discard log output during tests instead of writing to console and log files
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': True,
+    'handlers': {
+        'null': {
+            'class': 'logging.NullHandler',
+        },
+    },
+    'root': {
+        'handlers': ['null'],
+    },
+}
+
+
+class DisableMigrations:
+    """Build the test schema straight from the models instead of replaying migrations"""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+# Skip migrations when creating the test database; for quick local
+# iterations also reuse it between runs with `./manage.py test --keepdb`
+MIGRATION_MODULES = DisableMigrations()
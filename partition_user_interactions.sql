@@ -0,0 +1,97 @@
+-- ============================================================================
+-- Partition bot_userinteraction by month (Performance Optimization)
+-- ============================================================================
+-- Rebuilds bot_userinteraction as a table range-partitioned on "timestamp",
+-- one partition per month. DAU/WAU/MAU queries filter on a recent timestamp
+-- range, so PostgreSQL only has to read the last one or two partitions.
+--
+-- Run this in the Supabase SQL Editor during a quiet period: it copies every
+-- row and holds an exclusive lock on the table until it commits.
+-- Afterwards, schedule `python manage.py manage_interaction_partitions`
+-- (e.g. daily) to create upcoming partitions and drop expired ones.
+-- ============================================================================
+
+BEGIN;
+
+-- Partition bounds are calendar months in UTC, like the rest of the app
+SET LOCAL TIME ZONE 'UTC';
+
+-- Move the existing table aside and free up its index names
+ALTER TABLE bot_userinteraction RENAME TO bot_userinteraction_unpartitioned;
+DROP INDEX IF EXISTS bot_userint_user_id_87cf44_idx;
+DROP INDEX IF EXISTS bot_userint_timesta_8990d2_idx;
+DROP INDEX IF EXISTS bot_userint_timesta_b0071e_idx;
+DROP INDEX IF EXISTS bot_ui_ts_brin;
+
+-- The primary key has to include the partition key
+CREATE TABLE bot_userinteraction (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+    interaction_type VARCHAR(50) NOT NULL,
+    "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+    user_id BIGINT NOT NULL REFERENCES bot_user(id) DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY (id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+-- One partition per month from the oldest row up to next month.
+-- Storage parameters can't be set on the partitioned parent, so each
+-- partition gets migration 0015's autovacuum insert threshold itself.
+DO $$
+DECLARE
+    month_start DATE;
+    last_month DATE := (date_trunc('month', now()) + INTERVAL '1 month')::DATE;
+BEGIN
+    SELECT date_trunc('month', COALESCE(MIN("timestamp"), now()))::DATE
+    INTO month_start
+    FROM bot_userinteraction_unpartitioned;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF bot_userinteraction FOR VALUES FROM (%L) TO (%L) '
+            'WITH (autovacuum_vacuum_insert_scale_factor = 0.02)',
+            'bot_userinteraction_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::DATE
+        );
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+END $$;
+
+-- Catches rows outside the created months so inserts never fail
+CREATE TABLE bot_userinteraction_default PARTITION OF bot_userinteraction DEFAULT
+    WITH (autovacuum_vacuum_insert_scale_factor = 0.02);
+
+-- Same indexes Django knows about (created on every partition).
+-- Django's separate user_id foreign key index is not recreated: the
+-- (user_id, timestamp) index already serves those lookups.
+CREATE INDEX bot_userint_user_id_87cf44_idx ON bot_userinteraction (user_id, "timestamp");
+CREATE INDEX bot_userint_timesta_b0071e_idx ON bot_userinteraction ("timestamp", user_id);
+CREATE INDEX bot_ui_ts_brin ON bot_userinteraction USING brin ("timestamp") WITH (pages_per_range = 32);
+
+-- Copy the data and carry on numbering after the highest existing id
+INSERT INTO bot_userinteraction (id, interaction_type, "timestamp", user_id)
+SELECT id, interaction_type, "timestamp", user_id
+FROM bot_userinteraction_unpartitioned;
+
+SELECT setval(
+    pg_get_serial_sequence('bot_userinteraction', 'id'),
+    COALESCE((SELECT MAX(id) FROM bot_userinteraction), 0) + 1,
+    false
+);
+
+DROP TABLE bot_userinteraction_unpartitioned;
+
+COMMIT;
+
+-- Verify the partitions
+SELECT
+    child.relname AS partition,
+    pg_get_expr(child.relpartbound, child.oid) AS bounds
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = 'bot_userinteraction'
+ORDER BY child.relname;
+
+-- ============================================================================
+-- Done! bot_userinteraction is now partitioned by month.
+-- ============================================================================